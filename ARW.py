@@ -8,13 +8,45 @@ OSMIFO — Photo sorter (optimized .ARW preview)
 """
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from PIL import Image, ImageTk
+from PIL import Image, ImageTk, ImageOps
+from PIL.PngImagePlugin import PngInfo
+import hashlib
+import io
+import json
+import multiprocessing
 import os
+import pathlib
+import re
+import tempfile
+import urllib.parse
+from array import array
+import bisect
+import ctypes
+import errno
+import itertools
+from multiprocessing import shared_memory
+import select
 import shutil
+import struct
+import sys
+from collections import OrderedDict
 from datetime import datetime
 import threading
+import time
 import traceback
 
+# optional: ioctl FICLONE (reflink btrfs/XFS) — hanya di Linux/Unix
+try:
+    import fcntl
+except Exception:
+    fcntl = None
+
+# optional: sqlite3 (katalog metadata) — bisa tidak ada di build Python minimal
+try:
+    import sqlite3
+except Exception:
+    sqlite3 = None
+
 # optional: send to recycle bin
 try:
     from send2trash import send2trash
@@ -48,7 +80,44 @@ MUTED = "lightgray"         # secondary/placeholder text color
 MAX_IMAGE_SIZE = (800, 600)          # batas maksimum tampilan gambar (bukan ukuran wajib)
 SMALL_THUMB_SIZE = (160, 120)        # ukuran cuplikan prev/next
 GALLERY_THUMB_SIZE = (160, 120)      # ukuran thumbnail di Gallery Mode
+PYRAMID_MIN_EDGE = 96                # level pyramid berhenti dibuat di bawah sisi terpendek ini
+RENDER_TILE_SIZE = 256               # ukuran tile (px layar) untuk render zoom tinggi
+INPUT_FRAME_MS = 16                  # burst zoom/pan/resize digabung jadi maksimal 1 render per frame
+REFINE_IDLE_MS = 150                 # jeda tanpa input sebelum draft diganti hasil LANCZOS
+TILED_RENDER_FACTOR = 4              # render tiled jika bitmap hasil zoom > faktor ini x luas canvas
+GALLERY_OVERSCAN_ROWS = 2            # baris ekstra di atas/bawah viewport yang ikut digambar
 SUPPORTED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.arw')
+ARW_EMBEDDED_MIN_EDGE = 1000         # JPEG tertanam .arw lebih kecil dari ini -> fallback demosaic (viewer)
+REDUCING_GAP = 2.0                   # sisa skala minimal setelah reduce() integer sebelum resample akhir
+CACHE_BUDGET_FRACTION = 0.25         # porsi MemAvailable untuk semua cache gambar (override: OSMIFO_CACHE_MB)
+CACHE_BUDGET_FALLBACK = 1024 * 1024 * 1024   # dipakai jika /proc/meminfo tidak ada (non-Linux)
+CACHE_TIER_SHARES = {"preview": 0.40, "full": 0.25, "pyramid": 0.15, "gallery": 0.10, "render": 0.05, "thumb": 0.05}
+CACHE_PIN_RADIUS = 2                 # entri current_index +/- radius ini tidak pernah di-evict
+RAW_POSTPROCESS_ARGS = dict(use_camera_wb=True, no_auto_bright=True, output_bps=8, gamma=(2.2, 4.5))
+RAW_POOL_POLL_INTERVAL = 0.05        # detik; seberapa sering decode di process pool cek pembatalan
+PREFETCH_WORKERS = 2                 # thread decode background untuk prefetch viewer
+PREFETCH_AHEAD_MIN = 2               # jumlah gambar di depan (arah navigasi) yang selalu di-prefetch
+PREFETCH_AHEAD_MAX = 8               # batas look-ahead saat navigasi cepat
+PREFETCH_BEHIND = 2                  # look-behind saat navigasi pelan (1 saat cepat)
+PREFETCH_SPEED_WINDOW = 1.5          # detik; jendela untuk menghitung kecepatan navigasi
+TRANSFER_WORKERS = 3                 # transfer paralel (batch dari multi-select gallery)
+TRANSFER_RETRIES = 2                 # percobaan ulang move/copy yang gagal karena error I/O sementara
+TRANSFER_RETRY_DELAY = 0.75          # detik; dikali nomor percobaan
+TRANSFER_CHUNK = 4 * 1024 * 1024     # ukuran blok copy (progress dilaporkan per blok)
+TRANSFER_KERNEL_CHUNK = 64 * 1024 * 1024  # blok copy_file_range/sendfile (copy di kernel, tanpa buffer Python)
+FICLONE = 0x40049409                 # ioctl reflink Linux (_IOW(0x94, 9, int))
+TRANSFER_SHUTDOWN_TIMEOUT = 5.0      # detik menunggu transfer berjalan berhenti saat aplikasi ditutup
+TRANSFER_HISTORY = 200               # jumlah job selesai yang masih ditampilkan di jendela antrean
+SCAN_BATCH_SIZE = 512                # entri hasil scandir per batch yang dikirim ke UI
+SCAN_BATCH_INTERVAL = 0.15           # detik; batch dikirim lebih awal jika scan lambat (share jaringan)
+RECURSIVE_SCAN_WORKERS = 8           # thread scandir paralel untuk mode subfolder (menutupi latency NAS/kartu)
+WATCH_BATCH_INTERVAL = 0.2           # detik; event inotify dikumpulkan dulu lalu diterapkan sekaligus
+CAPTURE_SORT_WORKERS = 8             # thread pembaca header EXIF paralel untuk urut waktu ambil
+CAPTURE_REPOSITION_MAX = 8           # lebih dari ini file yang waktu ambilnya berubah -> urut ulang penuh
+CATALOG_BATCH = 100                  # hasil parse header per transaksi SQLite
+JOURNAL_COMPACT_RECORDS = 2000       # record journal usang (done/drop) sebelum file journal ditulis ulang
+HEADER_MAX_IFD_ENTRIES = 1000        # batas entri per IFD TIFF (file rusak tidak membuat parser berputar lama)
+GALLERY_THUMB_WORKERS = 3            # thread pembuat thumbnail Gallery Mode
 
 def human_readable_size(num_bytes: int) -> str:
     try:
@@ -64,6 +133,105 @@ def human_readable_size(num_bytes: int) -> str:
     return "—"
 
 
+def shrink_to_fit(im, target_size, resample=Image.Resampling.LANCZOS):
+    """
+    Perkecil im agar muat di target_size (aspect ratio tetap, tanpa upscale).
+    Pakai reduce() integer dulu (box filter murah), lalu resample akhir dengan sisa
+    skala >= REDUCING_GAP. Ukuran asli disimpan di info['source_size'].
+    """
+    source_size = im.info.get("source_size", im.size)
+    tw, th = target_size
+    w, h = im.size
+    scale = min(tw / w, th / h)
+    if scale >= 1.0:
+        out = im.copy()
+    else:
+        new_size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        factor = int(1.0 / scale / REDUCING_GAP)
+        if factor > 1:
+            im = im.reduce(factor)
+        out = im.resize(new_size, resample)
+    out.info["source_size"] = source_size
+    return out
+
+
+def available_memory_bytes():
+    """MemAvailable dari /proc/meminfo dalam byte, atau None jika tidak tersedia."""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except Exception:
+        pass
+    return None
+
+
+def default_cache_budget():
+    """Total budget cache gambar (byte): OSMIFO_CACHE_MB jika di-set, kalau tidak porsi dari RAM tersedia."""
+    env = os.environ.get("OSMIFO_CACHE_MB")
+    if env:
+        try:
+            return max(0, int(float(env) * 1024 * 1024))
+        except ValueError:
+            pass
+    avail = available_memory_bytes()
+    if avail is None:
+        return CACHE_BUDGET_FALLBACK
+    return int(avail * CACHE_BUDGET_FRACTION)
+
+
+def estimate_image_bytes(obj):
+    """Perkiraan memori piksel untuk PIL.Image / PhotoImage (dipakai untuk akuntansi cache)."""
+    try:
+        if isinstance(obj, Image.Image):
+            bytes_per_band = {"I": 4, "F": 4, "I;16": 2, "1": 1}.get(obj.mode, 1)
+            return obj.width * obj.height * len(obj.getbands()) * bytes_per_band
+        if isinstance(obj, ImageTk.PhotoImage):
+            return obj.width() * obj.height() * 4
+    except Exception:
+        pass
+    return sys.getsizeof(obj)
+
+
+def draft_resample(scale):
+    """Filter murah untuk render draft interaktif: NEAREST saat upscale, BILINEAR saat downscale."""
+    return Image.Resampling.NEAREST if scale >= 1.0 else Image.Resampling.BILINEAR
+
+
+def is_decode_error(exc):
+    """
+    True jika exc (atau exception penyebabnya) berarti file gambarnya memang rusak/tidak dikenali
+    oleh PIL/rawpy. Kondisi sementara (error I/O, rawpy tidak terpasang, decode dibatalkan) -> False.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, (Image.UnidentifiedImageError, Image.DecompressionBombError, SyntaxError)):
+            return True
+        if type(exc) is OSError and exc.errno is None:
+            return True   # PIL: "image file is truncated", "broken data stream", ...
+        if RAWPY_AVAILABLE and isinstance(exc, getattr(rawpy, "LibRawError", ())) \
+                and not isinstance(exc, getattr(rawpy, "LibRawIOError", ())):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def relative_subdirs(root, dirs):
+    """Folder dari dirs yang berada di dalam root, sebagai path relatif ter-normcase (untuk dikecualikan dari scan)."""
+    root = os.path.normpath(os.path.abspath(root))
+    out = set()
+    for d in dirs:
+        try:
+            rel = os.path.relpath(os.path.normpath(os.path.abspath(d)), root)
+        except ValueError:   # beda drive (Windows)
+            continue
+        if rel != os.curdir and rel != os.pardir and not rel.startswith(os.pardir + os.sep):
+            out.add(os.path.normcase(rel))
+    return frozenset(out)
+
+
 def human_readable_datetime(timestamp: float) -> str:
     try:
         dt = datetime.fromtimestamp(timestamp)
@@ -72,8 +240,301 @@ def human_readable_datetime(timestamp: float) -> str:
         return "—"
 
 
+# ------------------------------ Header-only metadata (EXIF/TIFF/ARW) ------------------------------
+def _exif_datetime(value):
+    """'YYYY:MM:DD HH:MM:SS' (EXIF) -> 'YYYY-MM-DD HH:MM:SS', atau None."""
+    if not value:
+        return None
+    value = value.strip().rstrip("\0")
+    if len(value) < 19 or value.startswith("0000"):
+        return None
+    return value[:4] + "-" + value[5:7] + "-" + value[8:10] + value[10:19]
+
+
+class _TiffReader:
+    """Baca IFD TIFF langsung dari file (seek + read kecil), tanpa memuat data gambar."""
+    TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8, 13: 4}
+
+    def __init__(self, f, base=0):
+        self.f = f
+        self.base = base
+        f.seek(base)
+        head = f.read(8)
+        if head[:2] == b"II":
+            self.endian = "<"
+        elif head[:2] == b"MM":
+            self.endian = ">"
+        else:
+            raise ValueError("bukan header TIFF")
+        magic, self.first_ifd = struct.unpack(self.endian + "HI", head[2:8])
+        if magic not in (42, 0x4F52, 0x5352):   # TIFF, ORF, RW2-ish
+            raise ValueError("magic TIFF tidak dikenal")
+
+    def read_ifd(self, offset):
+        """offset -> {tag: (type, count, raw 4 byte value/offset)}."""
+        if not offset:
+            return {}
+        f, e = self.f, self.endian
+        f.seek(self.base + offset)
+        raw = f.read(2)
+        if len(raw) < 2:
+            return {}
+        (count,) = struct.unpack(e + "H", raw)
+        if count > HEADER_MAX_IFD_ENTRIES:
+            return {}
+        data = f.read(12 * count)
+        entries = {}
+        for i in range(len(data) // 12):
+            tag, typ, n = struct.unpack_from(e + "HHI", data, i * 12)
+            entries[tag] = (typ, n, data[i * 12 + 8:i * 12 + 12])
+        return entries
+
+    def value(self, entries, tag):
+        """Nilai tag: int / str / list int; None jika tidak ada."""
+        entry = entries.get(tag)
+        if entry is None:
+            return None
+        typ, n, raw = entry
+        size = self.TYPE_SIZES.get(typ, 1) * n
+        if size > 4:
+            if size > 4096:
+                return None
+            (offset,) = struct.unpack(self.endian + "I", raw)
+            self.f.seek(self.base + offset)
+            raw = self.f.read(size)
+        if typ == 2:
+            return raw[:n].split(b"\0", 1)[0].decode("utf-8", "replace").strip() or None
+        if typ == 3:
+            vals = struct.unpack_from(self.endian + "%dH" % n, raw)
+        elif typ in (4, 13):
+            vals = struct.unpack_from(self.endian + "%dI" % n, raw)
+        elif typ == 9:
+            vals = struct.unpack_from(self.endian + "%di" % n, raw)
+        elif typ == 1:
+            vals = tuple(raw[:n])
+        else:
+            return None
+        return vals[0] if n == 1 else list(vals)
+
+
+def _parse_tiff_metadata(f, base, meta, is_raw=False):
+    """Isi meta dari struktur TIFF (EXIF JPEG, TIFF, ARW). ARW: dimensi asli dari SubIFD raw."""
+    t = _TiffReader(f, base)
+    ifd0 = t.read_ifd(t.first_ifd)
+    make = t.value(ifd0, 0x010F)
+    model = t.value(ifd0, 0x0110)
+    if make or model:
+        if make and model and model.lower().startswith(make.lower().split()[0]):
+            meta["camera"] = model
+        else:
+            meta["camera"] = " ".join(p for p in (make, model) if p)
+    orientation = t.value(ifd0, 0x0112)
+    if isinstance(orientation, int) and 1 <= orientation <= 8:
+        meta["orientation"] = orientation
+    meta["capture_time"] = _exif_datetime(t.value(ifd0, 0x0132))
+
+    exif_offset = t.value(ifd0, 0x8769)
+    if isinstance(exif_offset, int):
+        exif = t.read_ifd(exif_offset)
+        meta["capture_time"] = _exif_datetime(t.value(exif, 0x9003)) or meta["capture_time"]
+        lens = t.value(exif, 0xA434)
+        if lens:
+            meta["lens"] = lens
+        px, py = t.value(exif, 0xA002), t.value(exif, 0xA003)
+        if isinstance(px, int) and isinstance(py, int) and px and py and not meta.get("width"):
+            meta["width"], meta["height"] = px, py
+
+    if base != 0:
+        return   # EXIF di dalam JPEG: dimensi diambil dari SOF
+    width, height = t.value(ifd0, 0x0100), t.value(ifd0, 0x0101)
+    if is_raw:
+        # IFD0 ARW berisi thumbnail kecil; gambar penuh ada di SubIFD (NewSubfileType 0)
+        sub = t.value(ifd0, 0x014A)
+        for offset in (sub if isinstance(sub, list) else [sub] if isinstance(sub, int) else []):
+            sub_ifd = t.read_ifd(offset)
+            if t.value(sub_ifd, 0x00FE) not in (0, None):
+                continue
+            crop = t.value(sub_ifd, 0xC620)    # DefaultCropSize = area gambar efektif
+            if isinstance(crop, list) and len(crop) == 2:
+                width, height = crop
+            else:
+                width, height = t.value(sub_ifd, 0x0100), t.value(sub_ifd, 0x0101)
+            break
+    if isinstance(width, int) and isinstance(height, int):
+        meta["width"], meta["height"] = width, height
+
+
+def _parse_jpeg_metadata(f, meta):
+    f.seek(2)
+    while True:
+        b = f.read(1)
+        while b and b != b"\xff":
+            b = f.read(1)
+        while b == b"\xff":
+            b = f.read(1)
+        if not b:
+            return
+        marker = b[0]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            continue
+        if marker in (0xD9, 0xDA):        # EOI / SOS: header selesai
+            return
+        raw = f.read(2)
+        if len(raw) < 2:
+            return
+        (length,) = struct.unpack(">H", raw)
+        start = f.tell()
+        if marker == 0xE1 and f.read(6) == b"Exif\0\0":
+            try:
+                _parse_tiff_metadata(f, start + 6, meta)
+            except (ValueError, struct.error):
+                pass
+        elif 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            data = f.read(5)
+            if len(data) == 5:
+                _precision, h, w = struct.unpack(">BHH", data)
+                meta["width"], meta["height"] = w, h
+            return
+        f.seek(start + length - 2)
+
+
+def read_image_header(path):
+    """
+    Metadata dari header file saja (tanpa decode piksel): width/height asli, orientation,
+    capture_time ('YYYY-MM-DD HH:MM:SS'), camera, lens. Key yang tidak diketahui bernilai None.
+    """
+    meta = dict(width=None, height=None, orientation=None, capture_time=None, camera=None, lens=None)
+    with open(path, "rb") as f:
+        head = f.read(32)
+        try:
+            if head[:2] == b"\xff\xd8":
+                _parse_jpeg_metadata(f, meta)
+            elif head[:2] in (b"II", b"MM"):
+                _parse_tiff_metadata(f, 0, meta, is_raw=path.lower().endswith(".arw"))
+            elif head[:8] == b"\x89PNG\r\n\x1a\n":
+                meta["width"], meta["height"] = struct.unpack(">II", head[16:24])
+            elif head[:4] == b"GIF8":
+                meta["width"], meta["height"] = struct.unpack("<HH", head[6:10])
+            elif head[:2] == b"BM":
+                w, h = struct.unpack("<ii", head[18:26])
+                meta["width"], meta["height"] = w, abs(h)
+        except struct.error:
+            pass
+    return meta
+
+
+class MetadataCatalog:
+    """
+    Katalog SQLite metadata per file (XDG cache), dikunci path + size + mtime:
+    entri dianggap basi begitu ukuran/mtime file berubah. Menyimpan dimensi asli,
+    waktu pengambilan EXIF, kamera, lensa, orientasi dan flag gagal-decode.
+    Satu koneksi dipakai bersama thread UI & thread background (dijaga lock).
+    """
+    COLUMNS = ("width", "height", "orientation", "capture_time", "camera", "lens")
+
+    def __init__(self, path=None):
+        if path is None:
+            cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+            path = os.path.join(cache_home, "osmifo", "catalog.sqlite3")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime REAL NOT NULL,"
+                " width INTEGER, height INTEGER, orientation INTEGER, capture_time TEXT,"
+                " camera TEXT, lens TEXT,"
+                " header_read INTEGER NOT NULL DEFAULT 0, decode_failed INTEGER NOT NULL DEFAULT 0)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS files_capture_time ON files(capture_time)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS files_camera ON files(camera)")
+
+    @classmethod
+    def open_default(cls):
+        """Katalog default, atau None jika sqlite3 tidak tersedia / cache tidak bisa ditulis."""
+        if sqlite3 is None:
+            return None
+        try:
+            return cls()
+        except (OSError, sqlite3.Error):
+            return None
+
+    def _row_dict(self, row):
+        keys = ("path", "size", "mtime") + self.COLUMNS + ("header_read", "decode_failed")
+        return dict(zip(keys, row))
+
+    def get(self, path, size, mtime):
+        """Entri valid untuk (path, size, mtime), atau None."""
+        return self.get_many([(path, size, mtime)]).get(path)
+
+    def get_many(self, items):
+        """items: [(path, size, mtime)] -> {path: dict} hanya untuk entri yang masih cocok."""
+        wanted = {path: (size, mtime) for path, size, mtime in items}
+        found = {}
+        paths = list(wanted)
+        with self._lock:
+            for i in range(0, len(paths), 500):
+                chunk = paths[i:i + 500]
+                rows = self._db.execute(
+                    "SELECT path, size, mtime, %s, header_read, decode_failed FROM files WHERE path IN (%s)"
+                    % (", ".join(self.COLUMNS), ",".join("?" * len(chunk))), chunk).fetchall()
+                for row in rows:
+                    if (row[1], row[2]) == wanted[row[0]]:
+                        found[row[0]] = self._row_dict(row)
+        return found
+
+    def store_headers(self, entries):
+        """entries: [(path, size, mtime, meta)]; flag gagal-decode dipertahankan jika file tidak berubah."""
+        rows = [(path, size, mtime) + tuple(meta.get(c) for c in self.COLUMNS) for path, size, mtime, meta in entries]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO files (path, size, mtime, %s, header_read) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1) "
+                "ON CONFLICT(path) DO UPDATE SET %s, header_read = 1, "
+                "decode_failed = CASE WHEN files.size = excluded.size AND files.mtime = excluded.mtime "
+                "THEN files.decode_failed ELSE 0 END, size = excluded.size, mtime = excluded.mtime"
+                % (", ".join(self.COLUMNS), ", ".join(f"{c} = excluded.{c}" for c in self.COLUMNS)), rows)
+
+    def mark_failed(self, path, size, mtime):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO files (path, size, mtime, decode_failed) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT(path) DO UPDATE SET decode_failed = 1, "
+                "header_read = CASE WHEN files.size = excluded.size AND files.mtime = excluded.mtime "
+                "THEN files.header_read ELSE 0 END, size = excluded.size, mtime = excluded.mtime",
+                (path, size, mtime))
+
+    def find(self, under=None, camera=None, lens=None, taken_from=None, taken_to=None):
+        """Query metadata: path (urut waktu ambil) yang cocok dengan semua filter yang diisi."""
+        clauses, args = [], []
+        if under:
+            prefix = os.path.join(os.path.abspath(under), "")
+            clauses.append("substr(path, 1, ?) = ?")
+            args += [len(prefix), prefix]
+        for column, value in (("camera", camera), ("lens", lens)):
+            if value:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        if taken_from:
+            clauses.append("capture_time >= ?")
+            args.append(taken_from)
+        if taken_to:
+            clauses.append("capture_time <= ?")
+            args.append(taken_to)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        with self._lock:
+            return [row[0] for row in self._db.execute(
+                f"SELECT path FROM files{where} ORDER BY capture_time, path", args)]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
 class ToolTip:
-    """Tooltip sederhana untuk widget Tkinter."""
+    """Tooltip sederhana untuk widget Tkinter. text boleh callable (dievaluasi saat ditampilkan)."""
     def __init__(self, widget, text):
         self.widget = widget
         self.text = text
@@ -82,14 +543,15 @@ class ToolTip:
         widget.bind("<Leave>", self.hide)
 
     def show(self, _event):
-        if self.tw or not self.text:
+        text = self.text() if callable(self.text) else self.text
+        if self.tw or not text:
             return
         x = self.widget.winfo_rootx() + 20
         y = self.widget.winfo_rooty() + self.widget.winfo_height() + 5
         self.tw = tk.Toplevel(self.widget)
         self.tw.wm_overrideredirect(True)
         self.tw.geometry(f"+{x}+{y}")
-        lbl = tk.Label(self.tw, text=self.text, background="#ffffe0", relief="solid", borderwidth=1)
+        lbl = tk.Label(self.tw, text=text, background="#ffffe0", relief="solid", borderwidth=1)
         lbl.pack(ipadx=6, ipady=3)
 
     def hide(self, _event):
@@ -98,8 +560,2032 @@ class ToolTip:
             self.tw = None
 
 
+class ImagePyramid:
+    """
+    Pyramid mip (1, 1/2, 1/4, 1/8, ...) dari satu gambar. Level dibuat lazy dengan reduce(2)
+    dari level sebelumnya, jadi render sampling dari level terdekat di atas skala target
+    dan biayanya sebanding ukuran output, bukan ukuran gambar.
+    on_grow(pyramid) dipanggil setelah for_scale membuat level baru (akuntansi ulang byte cache).
+    """
+    __slots__ = ("levels", "on_grow", "_lock")
+
+    def __init__(self, base, on_grow=None):
+        self.levels = [base]
+        self.on_grow = on_grow
+        self._lock = threading.Lock()
+
+    @property
+    def base(self):
+        return self.levels[0]
+
+    def _build_next(self):
+        last = self.levels[-1]
+        if min(last.width, last.height) // 2 < PYRAMID_MIN_EDGE:
+            return False
+        self.levels.append(last.reduce(2))
+        return True
+
+    def build(self):
+        """Buat semua level sekaligus (dipakai di thread prefetch)."""
+        with self._lock:
+            while self._build_next():
+                pass
+        return self
+
+    def for_scale(self, scale):
+        """Return (image, level_scale): level terkecil yang skalanya masih >= scale."""
+        with self._lock:
+            built = len(self.levels)
+            n = 0
+            while True:
+                if n + 1 >= len(self.levels) and not self._build_next():
+                    break
+                nxt = self.levels[n + 1]
+                if nxt.width / self.base.width < scale:
+                    break
+                n += 1
+            level = self.levels[n]
+            grew = len(self.levels) != built
+        if grew and self.on_grow:
+            self.on_grow(self)
+        return level, level.width / self.base.width
+
+    def smallest_covering(self, size):
+        """Level terkecil yang sudah ada dan masih menutupi size (w, h); untuk thumbnail."""
+        with self._lock:
+            for level in reversed(self.levels):
+                if level.width >= size[0] or level.height >= size[1]:
+                    return level
+            return self.base
+
+    def nbytes(self):
+        """Memori level tambahan saja (level 0 sudah dihitung di preview cache)."""
+        return sum(estimate_image_bytes(level) for level in self.levels[1:])
+
+
+class FileTable:
+    """
+    Daftar file sumber berbentuk kolom array (nama, path, ukuran, mtime, ctime, tipe, tombstone)
+    dengan antarmuka mirip list nama: len / [i] / in / index / pop / insert / extend / iterasi
+    memakai index *live* (baris yang dihapus dilewati).
+    - pop(i): set tombstone + update Fenwick tree, O(log n) — tanpa menggeser list
+    - index live <-> baris fisik lewat Fenwick tree, O(log n)
+    - insert di tengah = rebuild O(n) (jarang: file dikembalikan / event watcher); rebuild juga
+      membuang tombstone, begitu juga pop jika tombstone sudah lebih banyak dari baris hidup.
+    Path absolut dihitung sekali saat baris ditambahkan (tidak ada join/normpath per navigasi).
+    """
+    __slots__ = ("root", "names", "paths", "sizes", "mtimes", "ctimes", "kinds", "dead",
+                 "_tree", "_live", "_row_of", "_base")
+    KIND_UNKNOWN = 255
+    KIND_CODES = {ext: code for code, ext in enumerate(SUPPORTED_EXTENSIONS)}
+
+    def __init__(self, root="", names=(), stats=None):
+        self.root = os.path.normpath(root) if root else ""
+        # nama dari scandir sudah bersih -> path = root + sep + nama (tanpa normpath per baris)
+        self._base = os.path.join(self.root, "") if root else ""
+        self._clear()
+        self.extend(names, stats)
+
+    def _clear(self):
+        self.names = []
+        self.paths = []
+        self.sizes = array("q")
+        self.mtimes = array("d")
+        self.ctimes = array("d")
+        self.kinds = bytearray()
+        self.dead = bytearray()
+        self._tree = array("l", [0])   # Fenwick 1-based atas bit "hidup"
+        self._live = 0
+        self._row_of = {}
+
+    # --- Fenwick ---
+    def _prefix(self, k):
+        """Jumlah baris hidup di baris fisik [0, k)."""
+        tree, total = self._tree, 0
+        while k > 0:
+            total += tree[k]
+            k -= k & -k
+        return total
+
+    def _update(self, row, delta):
+        tree, i, n = self._tree, row + 1, len(self._tree)
+        while i < n:
+            tree[i] += delta
+            i += i & -i
+
+    def _row(self, index):
+        """Baris fisik untuk index live ke-index (binary descent Fenwick)."""
+        if index < 0:
+            index += self._live
+        if not (0 <= index < self._live):
+            raise IndexError("FileTable index out of range")
+        tree, pos, remaining = self._tree, 0, index + 1
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(tree) and tree[nxt] < remaining:
+                pos = nxt
+                remaining -= tree[nxt]
+            step >>= 1
+        return pos
+
+    # --- rows ---
+    def _kind(self, name):
+        dot = name.rfind(".")
+        return self.KIND_CODES.get(name[dot:].lower(), self.KIND_UNKNOWN) if dot >= 0 else self.KIND_UNKNOWN
+
+    def _append_row(self, name, st=None):
+        row = len(self.names)
+        self.names.append(name)
+        self.paths.append(self._base + name if ".." not in name else os.path.normpath(self._base + name))
+        self.sizes.append(st.st_size if st is not None else -1)
+        self.mtimes.append(st.st_mtime if st is not None else 0.0)
+        self.ctimes.append(st.st_ctime if st is not None else 0.0)
+        self.kinds.append(self._kind(name))
+        self.dead.append(0)
+        self._row_of[name] = row
+        # node Fenwick baru menutup baris (i - lowbit(i), i]: 1 + node anak-anaknya
+        i = row + 1
+        total, j, low = 1, i - 1, i - (i & -i)
+        tree = self._tree
+        while j > low:
+            total += tree[j]
+            j -= j & -j
+        tree.append(total)
+        self._live += 1
+
+    def _rebuild(self, rows):
+        """rows: [(name, path, size, mtime, ctime, kind)] -> tabel baru tanpa tombstone (O(n))."""
+        self._clear()
+        if not rows:
+            return
+        names, paths, sizes, mtimes, ctimes, kinds = zip(*rows)
+        n = len(names)
+        self.names = list(names)
+        self.paths = list(paths)
+        self.sizes = array("q", sizes)
+        self.mtimes = array("d", mtimes)
+        self.ctimes = array("d", ctimes)
+        self.kinds = bytearray(kinds)
+        self.dead = bytearray(n)
+        self._row_of = {name: row for row, name in enumerate(self.names)}
+        tree = array("l", [1]) * (n + 1)
+        tree[0] = 0
+        for i in range(1, n + 1):
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self._tree = tree
+        self._live = n
+
+    def _row_data(self, r):
+        return self.names[r], self.paths[r], self.sizes[r], self.mtimes[r], self.ctimes[r], self.kinds[r]
+
+    def _live_rows(self):
+        dead = self.dead
+        return [self._row_data(r) for r in range(len(self.names)) if not dead[r]]
+
+    def _new_row(self, name, st=None):
+        path = self._base + name if ".." not in name else os.path.normpath(self._base + name)
+        if st is None:
+            return name, path, -1, 0.0, 0.0, self._kind(name)
+        return name, path, st.st_size, st.st_mtime, st.st_ctime, self._kind(name)
+
+    # --- list-like ---
+    def __len__(self):
+        return self._live
+
+    def __bool__(self):
+        return self._live > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.names[self._row(i)] for i in range(*index.indices(self._live))]
+        return self.names[self._row(index)]
+
+    def __iter__(self):
+        dead = self.dead
+        return (name for row, name in enumerate(self.names) if not dead[row])
+
+    def __contains__(self, name):
+        row = self._row_of.get(name)
+        return row is not None and not self.dead[row]
+
+    def index(self, name):
+        row = self._row_of.get(name)
+        if row is None or self.dead[row]:
+            raise ValueError(f"{name!r} is not in FileTable")
+        return self._prefix(row)
+
+    def pop(self, index):
+        row = self._row(index)
+        name = self.names[row]
+        self.dead[row] = 1
+        self._update(row, -1)
+        self._live -= 1
+        del self._row_of[name]
+        if len(self.names) > 1024 and len(self.names) > 2 * self._live:
+            self._rebuild(self._live_rows())
+        return name
+
+    def extend(self, names, stats=None):
+        if not self.names:
+            # tabel kosong -> bangun kolom sekaligus
+            seen = set()
+            rows = []
+            for name in names:
+                if name not in seen:
+                    seen.add(name)
+                    rows.append(self._new_row(name, stats.get(name) if stats else None))
+            self._rebuild(rows)
+            return
+        for name in names:
+            if name not in self:
+                self._append_row(name, stats.get(name) if stats else None)
+
+    def insert(self, index, name, st=None):
+        if name in self:
+            return
+        rows = self._live_rows()
+        rows.insert(max(0, min(index, len(rows))), self._new_row(name, st))
+        self._rebuild(rows)
+
+    def move(self, old, new):
+        """Pindahkan item di index live old ke new (index setelah item dilepas); kolom stat ikut."""
+        rows = self._live_rows()
+        rows.insert(max(0, min(new, len(rows) - 1)), rows.pop(old))
+        self._rebuild(rows)
+
+    def reorder(self, names, stats=None):
+        """Ganti isi & urutan dengan names; kolom stat lama dipakai ulang, sisanya dari stats."""
+        rows = []
+        for name in names:
+            row = self._row_of.get(name)
+            st = stats.get(name) if stats else None
+            if st is None and row is not None:
+                rows.append(self._row_data(row))
+            else:
+                rows.append(self._new_row(name, st))
+        self._rebuild(rows)
+
+    # --- kolom ---
+    def path_at(self, index):
+        return self.paths[self._row(index)]
+
+    def kind_at(self, index):
+        kind = self.kinds[self._row(index)]
+        return SUPPORTED_EXTENSIONS[kind] if kind != self.KIND_UNKNOWN else ""
+
+    def rows_snapshot(self):
+        """[(path, size, mtime)] untuk semua baris hidup (dipakai thread background)."""
+        dead = self.dead
+        return [(self.paths[r], self.sizes[r], self.mtimes[r]) for r in range(len(self.names)) if not dead[r]]
+
+    def stat_of(self, name):
+        """(size, mtime, ctime) dari scan, atau None jika belum diketahui."""
+        row = self._row_of.get(name)
+        if row is None or self.sizes[row] < 0:
+            return None
+        return self.sizes[row], self.mtimes[row], self.ctimes[row]
+
+    def set_stat(self, name, st):
+        row = self._row_of.get(name)
+        if row is not None:
+            self.sizes[row], self.mtimes[row], self.ctimes[row] = st.st_size, st.st_mtime, st.st_ctime
+
+
+class _GalleryCell:
+    """Satu cell gallery yang bisa di-recycle (item canvas + index yang sedang ditampilkan)."""
+    __slots__ = ("index", "bg_id", "img_id", "placeholder_id", "label_id", "photo")
+
+    def __init__(self, bg_id, img_id, placeholder_id, label_id):
+        self.index = None
+        self.bg_id = bg_id
+        self.img_id = img_id
+        self.placeholder_id = placeholder_id
+        self.label_id = label_id
+        self.photo = None
+
+
+class VirtualGalleryGrid:
+    """
+    Grid gallery virtual di atas satu tk.Canvas: hanya baris yang terlihat (+ overscan)
+    yang punya item canvas, dan cell di-recycle saat scroll. Biaya membuka gallery sama
+    untuk 50 atau 50.000 file.
+    - label_for(i) -> teks nama file
+    - thumb_for(i) -> PhotoImage atau None (placeholder)
+    - on_open(i)   -> dipanggil saat cell diklik
+    - on_view_changed(visible, overscan) -> index yang baru terlihat, untuk memprioritaskan loading
+    - placeholder_for(i) -> teks placeholder saat thumbnail belum ada
+    - on_select_changed(selected) -> dipanggil saat Ctrl/Shift+klik mengubah seleksi
+    """
+    CELL_PAD = 6
+    LABEL_HEIGHT = 34
+    LABEL_MAX_CHARS = 24
+
+    def __init__(self, parent, count, label_for, thumb_for, on_open, on_view_changed=None,
+                 placeholder_for=None, on_select_changed=None, thumb_size=GALLERY_THUMB_SIZE,
+                 overscan_rows=GALLERY_OVERSCAN_ROWS):
+        self.count = count
+        self.label_for = label_for
+        self.thumb_for = thumb_for
+        self.on_open = on_open
+        self.on_view_changed = on_view_changed
+        self.placeholder_for = placeholder_for
+        self.on_select_changed = on_select_changed
+        self.thumb_w, self.thumb_h = thumb_size
+        self.overscan_rows = overscan_rows
+        self.cell_w = self.thumb_w + 2 * self.CELL_PAD
+        self.cell_h = self.thumb_h + self.LABEL_HEIGHT + 2 * self.CELL_PAD
+        self.cols = 1
+        self.highlight_index = None
+        self.selected = set()     # index terpilih (Ctrl+klik toggle, Shift+klik rentang)
+        self._anchor = None
+        self._scrollregion = None
+        self._last_yview = None
+
+        self._cells = {}          # index -> _GalleryCell
+        self._free = []           # cell yang bisa dipakai ulang
+        self._item_cell = {}      # canvas item id -> _GalleryCell
+        self._refresh_pending = False
+
+        self.canvas = tk.Canvas(parent, highlightthickness=0, bg=DARK_BG)
+        self.vbar = tk.Scrollbar(parent, orient="vertical", command=self._yview)
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.vbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", lambda e: self.schedule_refresh())
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Button-4>", self._on_mousewheel)
+        self.canvas.bind("<Button-5>", self._on_mousewheel)
+        self.canvas.tag_bind("cell", "<Button-1>", self._on_click)
+        self.canvas.tag_bind("cell", "<Control-Button-1>", self._on_ctrl_click)
+        self.canvas.tag_bind("cell", "<Shift-Button-1>", self._on_shift_click)
+
+    # --- scrolling ---
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self.schedule_refresh()
+
+    def _on_yscroll(self, first, last):
+        self.vbar.set(first, last)
+        if (first, last) != self._last_yview:
+            self._last_yview = (first, last)
+            self.schedule_refresh()
+
+    def _on_mousewheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self.canvas.yview_scroll(-1, "units")
+        else:
+            self.canvas.yview_scroll(1, "units")
+        self.schedule_refresh()
+        return "break"
+
+    def scroll_to_index(self, index):
+        """Scroll supaya baris index terlihat."""
+        self._update_layout()
+        if not (0 <= index < self.count):
+            return
+        rows = max(1, -(-self.count // self.cols))
+        row = index // self.cols
+        self.canvas.yview_moveto(max(0.0, row / rows))
+        self.schedule_refresh()
+
+    # --- model ---
+    def set_count(self, count):
+        self.count = count
+        self.schedule_refresh()
+
+    def set_highlight(self, index):
+        old = self._cells.get(self.highlight_index)
+        self.highlight_index = index
+        if old is not None:
+            self._paint_highlight(old)
+        cell = self._cells.get(index)
+        if cell is not None:
+            self._paint_highlight(cell)
+
+    def set_selection(self, indices):
+        self.selected = {i for i in indices if 0 <= i < self.count}
+        for cell in self._cells.values():
+            self._paint_highlight(cell)
+        if self.on_select_changed:
+            self.on_select_changed(self.selected)
+
+    def clear_selection(self):
+        self._anchor = None
+        if self.selected:
+            self.set_selection(())
+
+    def indices_in_view(self):
+        """Index yang sedang punya cell (terlihat + overscan)."""
+        return sorted(self._cells.keys())
+
+    # --- rendering ---
+    def schedule_refresh(self):
+        if self._refresh_pending:
+            return
+        self._refresh_pending = True
+        try:
+            self.canvas.after_idle(self.refresh)
+        except Exception:
+            self._refresh_pending = False
+
+    def _update_layout(self):
+        width = max(self.canvas.winfo_width(), self.cell_w)
+        self.cols = max(1, width // self.cell_w)
+        rows = -(-self.count // self.cols)
+        region = (0, 0, self.cols * self.cell_w, max(rows * self.cell_h, 1))
+        if region != self._scrollregion:
+            self._scrollregion = region
+            self.canvas.configure(scrollregion=region)
+
+    def refresh(self):
+        """Gambar ulang hanya cell untuk baris terlihat + overscan; cell lain di-recycle."""
+        self._refresh_pending = False
+        try:
+            old_cols = self.cols
+            self._update_layout()
+            if self.cols != old_cols:
+                self._release_all()
+            top = self.canvas.canvasy(0)
+            height = max(self.canvas.winfo_height(), 1)
+        except tk.TclError:
+            return   # canvas sudah di-destroy
+        top_row = int(top // self.cell_h)
+        bottom_row = int((top + height) // self.cell_h)
+        first_row = max(0, top_row - self.overscan_rows)
+        last_row = bottom_row + self.overscan_rows
+        wanted = range(first_row * self.cols, min(self.count, (last_row + 1) * self.cols))
+
+        for index in [i for i in self._cells if i not in wanted]:
+            self._release(self._cells.pop(index))
+        for index in wanted:
+            if index not in self._cells:
+                self._bind_cell(self._acquire(), index)
+
+        if self.on_view_changed:
+            visible = range(top_row * self.cols, min(self.count, (bottom_row + 1) * self.cols))
+            overscan = [i for i in wanted if i not in visible]
+            self.on_view_changed(list(visible), overscan)
+
+    def rebind_visible(self):
+        """Isi ulang semua cell aktif (mis. setelah daftar file berubah)."""
+        self._release_all()
+        self.schedule_refresh()
+
+    def _acquire(self):
+        if self._free:
+            return self._free.pop()
+        c = self.canvas
+        bg_id = c.create_rectangle(0, 0, 0, 0, fill=DARK_BG, outline=DARK_BG, width=2, tags=("cell",))
+        img_id = c.create_image(0, 0, anchor="center", tags=("cell",))
+        placeholder_id = c.create_text(0, 0, text="Memuat…", fill=MUTED, tags=("cell",))
+        label_id = c.create_text(0, 0, anchor="n", fill=FG, width=self.thumb_w, justify="center", tags=("cell",))
+        cell = _GalleryCell(bg_id, img_id, placeholder_id, label_id)
+        for item in (bg_id, img_id, placeholder_id, label_id):
+            self._item_cell[item] = cell
+        return cell
+
+    def _release(self, cell):
+        cell.index = None
+        cell.photo = None
+        for item in (cell.bg_id, cell.img_id, cell.placeholder_id, cell.label_id):
+            self.canvas.itemconfigure(item, state="hidden")
+        self.canvas.itemconfigure(cell.img_id, image="")
+        self._free.append(cell)
+
+    def _release_all(self):
+        for cell in self._cells.values():
+            self._release(cell)
+        self._cells.clear()
+
+    def _short_label(self, text):
+        if len(text) <= self.LABEL_MAX_CHARS:
+            return text
+        keep = (self.LABEL_MAX_CHARS - 1) // 2
+        return text[:keep] + "…" + text[-keep:]
+
+    # --- incremental model updates (O(visible)) ---
+    def remove_index(self, index):
+        """Item index dihapus dari model: cell sesudahnya digeser satu slot, tanpa decode ulang."""
+        if not (0 <= index < self.count):
+            return
+        self.count -= 1
+        self.selected = {i - (i > index) for i in self.selected if i != index}
+        cells, self._cells = self._cells, {}
+        for i, cell in cells.items():
+            if i < index:
+                self._cells[i] = cell
+            elif i == index:
+                self._release(cell)
+            else:
+                self._cells[i - 1] = cell
+                self._place_cell(cell, i - 1)
+        self.schedule_refresh()
+
+    def insert_index(self, index):
+        """Item baru disisipkan di index: cell mulai index digeser satu slot, slot baru diisi saat refresh."""
+        index = max(0, min(index, self.count))
+        self.count += 1
+        self.selected = {i + (i >= index) for i in self.selected}
+        cells, self._cells = self._cells, {}
+        for i, cell in cells.items():
+            if i < index:
+                self._cells[i] = cell
+            else:
+                self._cells[i + 1] = cell
+                self._place_cell(cell, i + 1)
+        self.schedule_refresh()
+
+    def remove_indices(self, indices):
+        """Hapus banyak item sekaligus (batch): satu kali geser cell + satu refresh."""
+        removed = sorted({i for i in indices if 0 <= i < self.count})
+        if not removed:
+            return
+        self.count -= len(removed)
+        shift = lambda i: i - bisect.bisect_left(removed, i)
+        removed_set = set(removed)
+        self.selected = {shift(i) for i in self.selected if i not in removed_set}
+        self._anchor = None
+        cells, self._cells = self._cells, {}
+        for i, cell in cells.items():
+            if i in removed_set:
+                self._release(cell)
+            else:
+                self._cells[shift(i)] = cell
+                self._place_cell(cell, shift(i))
+        self.schedule_refresh()
+
+    def move_index(self, src, dst):
+        """Item pindah posisi (reorder)."""
+        if src == dst:
+            return
+        self.remove_index(src)
+        self.insert_index(dst)
+
+    def _place_cell(self, cell, index):
+        c = self.canvas
+        cell.index = index
+        row, col = divmod(index, self.cols)
+        x0, y0 = col * self.cell_w, row * self.cell_h
+        cx = x0 + self.cell_w / 2
+        cy = y0 + self.CELL_PAD + self.thumb_h / 2
+        c.coords(cell.bg_id, x0 + 2, y0 + 2, x0 + self.cell_w - 2, y0 + self.cell_h - 2)
+        c.coords(cell.img_id, cx, cy)
+        c.coords(cell.placeholder_id, cx, cy)
+        c.coords(cell.label_id, cx, y0 + self.CELL_PAD + self.thumb_h + 4)
+        self._paint_highlight(cell)
+
+    def _bind_cell(self, cell, index):
+        c = self.canvas
+        self._cells[index] = cell
+        self._place_cell(cell, index)
+        c.itemconfigure(cell.label_id, text=self._short_label(self.label_for(index)), state="normal")
+        c.itemconfigure(cell.bg_id, state="normal")
+        placeholder = self.placeholder_for(index) if self.placeholder_for else "Memuat…"
+        self.set_cell_thumb(index, self.thumb_for(index), placeholder)
+
+    def set_cell_thumb(self, index, photo, placeholder_text="Preview\nunavailable"):
+        """Pasang PhotoImage ke cell index (jika sedang terlihat)."""
+        cell = self._cells.get(index)
+        if cell is None:
+            return
+        cell.photo = photo
+        if photo is not None:
+            self.canvas.itemconfigure(cell.img_id, image=photo, state="normal")
+            self.canvas.itemconfigure(cell.placeholder_id, state="hidden")
+        else:
+            self.canvas.itemconfigure(cell.img_id, image="", state="hidden")
+            self.canvas.itemconfigure(cell.placeholder_id, text=placeholder_text, state="normal")
+
+    def _paint_highlight(self, cell):
+        color = "#3d7eff" if cell.index is not None and cell.index == self.highlight_index else DARK_BG
+        fill = "#24406e" if cell.index in self.selected else DARK_BG
+        self.canvas.itemconfigure(cell.bg_id, outline=color, fill=fill)
+
+    def _event_index(self):
+        current = self.canvas.find_withtag("current")
+        cell = self._item_cell.get(current[0]) if current else None
+        return cell.index if cell is not None else None
+
+    def _on_click(self, _event):
+        index = self._event_index()
+        if index is not None:
+            self.on_open(index)
+
+    def _on_ctrl_click(self, _event):
+        index = self._event_index()
+        if index is None:
+            return "break"
+        self._anchor = index
+        self.set_selection(self.selected ^ {index})
+        return "break"
+
+    def _on_shift_click(self, _event):
+        index = self._event_index()
+        if index is None:
+            return "break"
+        anchor = self._anchor if self._anchor is not None else (self.highlight_index or 0)
+        lo, hi = sorted((anchor, index))
+        self.set_selection(self.selected | set(range(lo, hi + 1)))
+        return "break"
+
+
+class ByteBudgetCache:
+    """
+    Cache LRU dengan akuntansi byte dan budget per tier.
+    Interface mirip dict (in, [], get, del, pop, clear) supaya bisa menggantikan dict biasa.
+    Key yang di-pin (sekitar current_index) tidak pernah di-evict.
+    """
+    def __init__(self, name, budget_bytes, sizeof=estimate_image_bytes):
+        self.name = name
+        self.budget_bytes = int(budget_bytes)
+        self.sizeof = sizeof
+        self.total_bytes = 0
+        self._data = OrderedDict()   # key -> (value, nbytes), urutan = LRU (awal = paling lama)
+        self._pinned = frozenset()
+        self._lock = threading.RLock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def __getitem__(self, key):
+        with self._lock:
+            value, _nbytes = self._data[key]
+            self._data.move_to_end(key)
+            return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        nbytes = self.sizeof(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self._data[key] = (value, nbytes)
+            self.total_bytes += nbytes
+            self._evict()
+
+    def __delitem__(self, key):
+        with self._lock:
+            _value, nbytes = self._data.pop(key)
+            self.total_bytes -= nbytes
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is None:
+                return default
+            self.total_bytes -= item[1]
+            return item[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def remove_if(self, predicate):
+        """Hapus semua entri yang key-nya memenuhi predicate(key)."""
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                _value, nbytes = self._data.pop(key)
+                self.total_bytes -= nbytes
+
+    def update_size(self, key, value):
+        """Hitung ulang byte entri key jika masih berisi value (nilai yang tumbuh setelah disimpan)."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] is not value:
+                return
+            nbytes = self.sizeof(value)
+            self._data[key] = (value, nbytes)
+            self.total_bytes += nbytes - item[1]
+            self._evict()
+
+    def keys(self):
+        with self._lock:
+            return list(self._data.keys())
+
+    def set_pinned(self, keys):
+        with self._lock:
+            self._pinned = frozenset(keys)
+            self._evict()
+
+    def set_budget(self, budget_bytes):
+        with self._lock:
+            self.budget_bytes = int(budget_bytes)
+            self._evict()
+
+    def _evict(self):
+        if self.total_bytes <= self.budget_bytes:
+            return
+        for key in list(self._data.keys()):
+            if self.total_bytes <= self.budget_bytes:
+                break
+            if key in self._pinned:
+                continue
+            _value, nbytes = self._data.pop(key)
+            self.total_bytes -= nbytes
+
+
+class RawDecodeCancelled(RuntimeError):
+    """Decode RAW dibatalkan (worker process sudah dihentikan)."""
+
+
+class RawDecodePoolUnavailable(RuntimeError):
+    """Process pool tidak bisa dijalankan di lingkungan ini -> pakai decode in-process."""
+
+
+def _raw_decode_worker(conn):
+    """
+    Loop proses worker: terima (path, half_size, shm_name), demosaic dengan rawpy lalu kirim
+    hasil RGB lewat shared memory bernama shm_name (bukan pickle). Parent yang unlink
+    shared memory-nya, juga saat decode dibatalkan setelah segmen dibuat.
+    """
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        path, half_size, shm_name = task
+        try:
+            with rawpy.imread(path) as raw:
+                rgb = raw.postprocess(half_size=half_size, **RAW_POSTPROCESS_ARGS)
+            h, w = rgb.shape[0], rgb.shape[1]
+            shm = shared_memory.SharedMemory(name=shm_name, create=True, size=rgb.nbytes)
+            try:
+                shm.buf[:rgb.nbytes] = memoryview(rgb).cast("B")
+                conn.send(("ok", shm.name, w, h))
+            finally:
+                shm.close()
+        except Exception as e:
+            try:
+                conn.send(("err", str(e)))
+            except Exception:
+                return
+
+
+def _image_from_shared_memory(name, width, height):
+    """Salin RGB dari shared memory worker ke PIL.Image lalu bebaskan segmennya."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        view = Image.frombuffer("RGB", (width, height), shm.buf, "raw", "RGB", 0, 1)
+        im = view.copy()
+        del view
+    finally:
+        shm.close()
+        shm.unlink()
+    return im
+
+
+def _unlink_shared_memory(name):
+    """Bebaskan segmen shared memory yang tidak jadi dibaca (decode dibatalkan); diam jika tidak ada."""
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except OSError:
+        return
+    shm.close()
+    try:
+        shm.unlink()
+    except OSError:
+        pass
+
+
+class RawDecodePool:
+    """
+    Pool proses untuk demosaic RAW (LibRaw) supaya decode berat jalan paralel di semua core,
+    tidak berebut GIL. decode() dipanggil dari thread background dan blocking; jika
+    should_cancel() jadi True, worker-nya di-terminate (CPU langsung berhenti) dan diganti baru.
+    """
+    def __init__(self, max_workers=None):
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.available = True
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle = []          # [(process, conn)]
+        self._count = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._shm_ids = itertools.count(1)
+
+    def _spawn(self):
+        parent_conn, child_conn = self._ctx.Pipe()
+        proc = self._ctx.Process(target=_raw_decode_worker, args=(child_conn,), daemon=True)
+        proc.start()
+        child_conn.close()
+        return proc, parent_conn
+
+    def _acquire(self):
+        with self._cond:
+            while not self._idle and self._count >= self.max_workers:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._count += 1
+        try:
+            return self._spawn()
+        except Exception as e:
+            with self._cond:
+                self._count -= 1
+                self.available = False
+                self._cond.notify()
+            raise RawDecodePoolUnavailable(f"Process pool tidak tersedia: {e}")
+
+    def _release(self, worker):
+        with self._cond:
+            if not self._closed:
+                self._idle.append(worker)
+                self._cond.notify()
+                return
+        self._discard(worker)
+
+    def _discard(self, worker, shm_name=None):
+        """Hentikan worker; hasil yang sudah terkirim tapi tidak dibaca dibuang beserta segmen shared memory-nya."""
+        proc, conn = worker
+        try:
+            proc.terminate()
+            proc.join(1.0)
+        except Exception:
+            pass
+        try:
+            while conn.poll(0):
+                msg = conn.recv()
+                if msg and msg[0] == "ok":
+                    _unlink_shared_memory(msg[1])
+        except Exception:
+            pass
+        if shm_name:
+            # worker bisa mati setelah membuat segmen tapi sebelum mengirim pesannya
+            _unlink_shared_memory(shm_name)
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._count -= 1
+            self._cond.notify()
+
+    def decode(self, path, half_size=True, should_cancel=None):
+        """Return PIL.Image hasil demosaic path. Raise RawDecodeCancelled / RuntimeError."""
+        if should_cancel and should_cancel():
+            raise RawDecodeCancelled(path)
+        worker = self._acquire()
+        proc, conn = worker
+        shm_name = f"osmifo_{os.getpid()}_{next(self._shm_ids)}"
+        try:
+            conn.send((path, half_size, shm_name))
+            while not conn.poll(RAW_POOL_POLL_INTERVAL):
+                if should_cancel and should_cancel():
+                    raise RawDecodeCancelled(path)
+                if not proc.is_alive():
+                    raise RuntimeError("worker decode berhenti mendadak")
+            msg = conn.recv()
+        except BaseException:
+            self._discard(worker, shm_name)
+            raise
+        self._release(worker)
+        if msg[0] != "ok":
+            raise RuntimeError(msg[1])
+        _status, name, width, height = msg
+        return _image_from_shared_memory(name, width, height)
+
+    def shutdown(self):
+        """Hentikan semua worker idle; worker yang sedang decode dihentikan saat dikembalikan."""
+        with self._cond:
+            self._closed = True
+            self.available = False
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            self._discard(worker)
+
+
+class PreviewPrefetcher:
+    """
+    Decode gambar di background ke cache (preview viewer, juga thumbnail gallery).
+    schedule() mengganti seluruh antrean (urut prioritas); hasil decode yang sudah tidak
+    diinginkan lagi (user lompat/scroll jauh) dibuang. on_done(path, ok) dipanggil dari
+    thread worker: ok True = tersimpan di cache, False = decode gagal, None = dibuang (basi).
+    """
+    def __init__(self, decode, cache, on_done=None, workers=PREFETCH_WORKERS):
+        self.decode = decode          # callable(path, target_size, should_cancel) -> PIL.Image
+        self.cache = cache
+        self.on_done = on_done
+        self._cond = threading.Condition()
+        self._queue = []
+        self._wanted = frozenset()
+        self._inflight = set()
+        self._target_size = None
+        for _ in range(max(1, workers)):
+            t = threading.Thread(target=self._worker)
+            t.daemon = True
+            t.start()
+
+    def schedule(self, paths, target_size=None, keep=()):
+        """paths di-decode berurutan; keep = path yang masih diinginkan jika sedang di-decode, tapi tidak diantrekan."""
+        with self._cond:
+            self._target_size = target_size
+            self._wanted = frozenset(paths) | frozenset(keep)
+            self._queue = [p for p in paths if p not in self.cache and p not in self._inflight]
+            self._cond.notify_all()
+
+    def cancel(self):
+        self.schedule([])
+
+    def is_inflight(self, path):
+        with self._cond:
+            return path in self._inflight
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                path = self._queue.pop(0)
+                if path in self.cache or path in self._inflight:
+                    continue
+                self._inflight.add(path)
+                target_size = self._target_size
+            ok = None
+            try:
+                im = self.decode(path, target_size, lambda: path not in self._wanted)
+                if im is None:
+                    # decoder yang melaporkan gagal lewat None (mis. _load_thumb_pil) = gagal decode
+                    raise ValueError(f"tidak bisa di-decode: {path}")
+                with self._cond:
+                    if path in self._wanted:
+                        self.cache[path] = im
+                        ok = True
+            except RawDecodeCancelled:
+                pass
+            except Exception:
+                ok = False
+            finally:
+                with self._cond:
+                    self._inflight.discard(path)
+            if self.on_done:
+                try:
+                    self.on_done(path, ok)
+                except Exception:
+                    pass
+
+
+class TransferCancelled(RuntimeError):
+    """Transfer yang sedang berjalan dibatalkan user (file .osmifo-part sudah dihapus)."""
+
+
+class TransferJob:
+    """Satu keputusan pindah/salin file yang dijalankan TransferQueue."""
+    __slots__ = ("job_id", "src", "name", "dest_dir", "copy", "status", "target",
+                 "bytes_done", "bytes_total", "attempts", "error", "method", "fixed_target", "journal_id",
+                 "cancel_requested")
+
+    def __init__(self, job_id, src, name, dest_dir, copy):
+        self.job_id = job_id
+        self.src = src
+        self.name = name              # nama di image_list (untuk dikembalikan jika gagal/batal)
+        self.dest_dir = dest_dir
+        self.copy = copy
+        self.status = "pending"       # pending | running | done | failed | cancelled
+        self.target = None
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.attempts = 0
+        self.error = None
+        self.method = None            # strategi yang dipakai: rename | reflink | copy_file_range | sendfile | stream | skip
+        self.fixed_target = None      # path tujuan semua percobaan: dari journal (Mode Tunda) atau dipilih di percobaan pertama
+        self.journal_id = None
+        self.cancel_requested = False  # diset cancel() saat job sedang berjalan; dicek di setiap blok copy
+
+    @property
+    def progress(self):
+        if self.bytes_total <= 0:
+            return 1.0 if self.status == "done" else 0.0
+        return min(1.0, self.bytes_done / self.bytes_total)
+
+
+class TransferQueue:
+    """
+    Jalankan move/copy di thread background supaya hotkey sortir tidak menunggu disk.
+    make_target(dest_dir, filename, reserved) memilih path tujuan unik saat job mulai jalan;
+    reserved = path tujuan job lain yang tertunda/berjalan (belum ada di disk).
+    on_target(job) dipanggil dari thread worker setelah path tujuan baru dipilih, sebelum data ditulis.
+    on_update(job) dipanggil dari thread worker setiap status/progress berubah.
+    Job ke device tujuan yang sama dijalankan berurutan oleh satu worker (urutan antrean),
+    jadi beberapa worker hanya berjalan paralel untuk disk tujuan yang berbeda.
+    """
+    def __init__(self, make_target, on_update=None, workers=1, retries=TRANSFER_RETRIES, on_target=None):
+        self.make_target = make_target
+        self.on_update = on_update
+        self.on_target = on_target
+        self.retries = retries
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._pending = []
+        self._active = {}
+        self._history = []
+        self._routing = []          # job yang sudah diambil worker tapi device tujuannya sedang di-stat
+        self._busy_devices = set()
+        self._device_backlog = {}   # st_dev tujuan -> job yang menunggu worker pemegang device itu
+        self._target_lock = threading.Lock()
+        self._reserved_targets = set()
+        # strategi copy tercepat yang berhasil per pasangan (st_dev sumber, st_dev tujuan)
+        # (reflink -> copy_file_range -> sendfile -> stream)
+        self._copy_strategy = {}
+        self._closed = False
+        self._threads = []
+        for _ in range(max(1, workers)):
+            t = threading.Thread(target=self._worker)
+            t.daemon = True
+            t.start()
+            self._threads.append(t)
+
+    def submit_batch(self, items, dest_dir, copy, targets=None, journal_ids=None):
+        """
+        items: [(src, name), ...] -> satu kali lock/notify untuk seluruh batch.
+        targets/journal_ids (opsional, sejajar items): path tujuan tetap + id keputusan journal.
+        """
+        jobs = [TransferJob(next(self._ids), src, name, dest_dir, copy) for src, name in items]
+        for i, job in enumerate(jobs):
+            if targets:
+                job.fixed_target = targets[i]
+            if journal_ids:
+                job.journal_id = journal_ids[i]
+        with self._target_lock:
+            # target yang sudah dicatat journal tapi belum ada di disk tidak boleh diklaim job lain
+            self._reserved_targets.update(job.fixed_target for job in jobs if job.fixed_target)
+        with self._cond:
+            self._pending.extend(jobs)
+            self._cond.notify_all()
+        for job in jobs:
+            self._notify(job)
+        return jobs
+
+    def submit(self, src, name, dest_dir, copy):
+        job = TransferJob(next(self._ids), src, name, dest_dir, copy)
+        with self._cond:
+            self._pending.append(job)
+            self._cond.notify()
+        self._notify(job)
+        return job
+
+    def cancel(self, job_id):
+        """
+        Batalkan job. Job tertunda langsung berstatus cancelled; job yang sedang berjalan
+        berhenti di blok copy berikutnya (file .part dihapus). Return job-nya, atau None jika sudah selesai.
+        """
+        with self._cond:
+            job = self._active.get(job_id)
+            if job is not None:
+                job.cancel_requested = True
+                return job
+            for queue in self._queues():
+                job = next((j for j in queue if j.job_id == job_id), None)
+                if job is not None:
+                    queue.remove(job)
+                    job.status = "cancelled"
+                    self._remember(job)
+                    break
+            else:
+                return None
+        if job.fixed_target:
+            with self._target_lock:
+                self._reserved_targets.discard(job.fixed_target)
+        self._notify(job)
+        return job
+
+    def shutdown(self, timeout=TRANSFER_SHUTDOWN_TIMEOUT, poll=None):
+        """
+        Batalkan semua job (tertunda langsung, berjalan di blok copy berikutnya), tunggu worker
+        berhenti maksimal timeout detik, lalu hapus file .part yang masih tertinggal.
+        on_update tidak dipanggil lagi; poll() (mis. root.update) dijalankan selama menunggu supaya
+        worker yang sedang memanggil Tk tidak terkunci.
+        """
+        with self._cond:
+            self._closed = True
+            self.on_update = None
+            for queue in self._queues():
+                for job in queue:
+                    job.status = "cancelled"
+                    self._remember(job)
+                del queue[:]
+            active = list(self._active.values())
+            for job in active:
+                job.cancel_requested = True
+            self._cond.notify_all()
+        deadline = time.monotonic() + timeout
+        for t in self._threads:
+            while t.is_alive() and time.monotonic() < deadline:
+                t.join(0.05)
+                if poll is not None:
+                    poll()
+        for job in active:
+            if job.target:
+                try:
+                    os.remove(job.target + ".osmifo-part")
+                except OSError:
+                    pass
+
+    def jobs(self):
+        """Snapshot semua job: berjalan, tertunda, lalu riwayat terbaru."""
+        with self._cond:
+            return (list(self._active.values()) + [job for queue in self._queues() for job in queue]
+                    + list(reversed(self._history)))
+
+    def pending_count(self):
+        with self._cond:
+            return sum(len(queue) for queue in self._queues()) + len(self._active)
+
+    def _queues(self):
+        return [self._pending, self._routing] + list(self._device_backlog.values())
+
+    def strategy_for(self, src, dest_dir):
+        """Strategi copy yang terakhir berhasil dari device src ke device dest_dir (None jika belum pernah)."""
+        try:
+            return self._copy_strategy.get((os.stat(src).st_dev, os.stat(dest_dir).st_dev))
+        except OSError:
+            return None
+
+    def _remember(self, job):
+        self._history.append(job)
+        del self._history[:-TRANSFER_HISTORY]
+
+    def _notify(self, job):
+        on_update = self.on_update
+        if on_update:
+            try:
+                on_update(job)
+            except Exception:
+                pass
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                job = self._pending.pop(0)
+                self._routing.append(job)
+            device = self._device_of(job.dest_dir)
+            with self._cond:
+                if job not in self._routing:
+                    continue   # dibatalkan selama stat
+                self._routing.remove(job)
+                if device in self._busy_devices:
+                    # worker lain sedang menulis ke disk ini; ia menjalankan job ini setelahnya
+                    self._device_backlog.setdefault(device, []).append(job)
+                    continue
+                self._busy_devices.add(device)
+                job.status = "running"
+                self._active[job.job_id] = job
+            while job is not None:
+                self._notify(job)
+                self._run(job)
+                with self._cond:
+                    self._active.pop(job.job_id, None)
+                    self._remember(job)
+                    backlog = self._device_backlog.get(device)
+                    if backlog:
+                        next_job = backlog.pop(0)
+                        next_job.status = "running"
+                        self._active[next_job.job_id] = next_job
+                    else:
+                        next_job = None
+                        self._device_backlog.pop(device, None)
+                        self._busy_devices.discard(device)
+                self._notify(job)
+                job = next_job
+
+    @staticmethod
+    def _device_of(dest_dir):
+        """st_dev folder tujuan (atau induk terdekat yang ada jika folder belum dibuat)."""
+        path = os.path.abspath(dest_dir)
+        while True:
+            try:
+                return os.stat(path).st_dev
+            except OSError:
+                parent = os.path.dirname(path)
+                if parent == path:
+                    return None
+                path = parent
+
+    def _run(self, job):
+        try:
+            for attempt in range(self.retries + 1):
+                job.attempts = attempt + 1
+                try:
+                    if job.cancel_requested:
+                        raise TransferCancelled(job.name)
+                    if job.journal_id is not None:
+                        # commit Mode Tunda: folder tujuan bisa sudah dihapus sejak keputusan dicatat
+                        os.makedirs(job.dest_dir, exist_ok=True)
+                    if job.fixed_target is None:
+                        self._pin_target(job)
+                    job.target = job.fixed_target
+                    self._transfer(job)
+                    job.status = "done"
+                    job.error = None
+                    return
+                except TransferCancelled:
+                    job.status = "cancelled"
+                    job.error = None
+                    return
+                except OSError as e:
+                    job.error = str(e)
+                    # hanya error I/O sementara yang diulang; izin/disk penuh/read-only/sumber hilang tidak
+                    if e.errno not in self.RETRY_ERRNOS or attempt >= self.retries:
+                        break
+                    self._notify(job)
+                    time.sleep(TRANSFER_RETRY_DELAY * (attempt + 1))
+                except Exception as e:
+                    job.error = str(e)
+                    break
+            job.status = "failed"
+        finally:
+            if job.target:
+                with self._target_lock:
+                    self._reserved_targets.discard(job.target)
+
+    def _pin_target(self, job):
+        """
+        Pilih tujuan sekali per job: percobaan ulang menulis ke path yang sama, jadi salinan
+        yang sudah lengkap tidak diduplikasi ke nama "(1)". on_target (mis. catat ke journal)
+        harus berhasil sebelum path dipakai.
+        """
+        with self._target_lock:
+            target = self.make_target(job.dest_dir, os.path.basename(job.name), self._reserved_targets)
+            self._reserved_targets.add(target)
+        job.target = target
+        try:
+            if self.on_target:
+                self.on_target(job)
+        except BaseException:
+            with self._target_lock:
+                self._reserved_targets.discard(target)
+            job.target = None
+            raise
+        job.fixed_target = target
+
+    COPY_STRATEGIES = ("reflink", "copy_file_range", "sendfile", "stream")
+    RETRY_ERRNOS = frozenset((errno.EIO, errno.EAGAIN, errno.ETIMEDOUT, errno.ESTALE))
+
+    @staticmethod
+    def same_device(src, dest_dir):
+        try:
+            return os.stat(src).st_dev == os.stat(dest_dir).st_dev
+        except OSError:
+            return False
+
+    def _transfer(self, job):
+        if self._target_complete(job):
+            # percobaan sebelumnya (atau sesi sebelum crash) sudah mempublikasikan salinan lengkap,
+            # mis. os.remove sumber yang gagal -> tinggal hapus sumber yang tersisa
+            job.method = job.method or "skip"
+            job.bytes_done = job.bytes_total
+            if not job.copy and os.path.lexists(job.src):
+                os.remove(job.src)
+            return
+        if not job.copy and self.same_device(job.src, job.dest_dir):
+            # satu filesystem -> pindah entri direktori, tanpa menyalin data
+            try:
+                size = os.lstat(job.src).st_size
+                self._publish(job, job.src)
+                job.method = "rename"
+                job.bytes_total = job.bytes_done = size
+                return
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+        self._copy_with_progress(job)
+        if not job.copy:
+            os.remove(job.src)
+
+    LINK_UNSUPPORTED_ERRNOS = frozenset((errno.EPERM, errno.EOPNOTSUPP, errno.ENOSYS, errno.EMLINK, errno.EINVAL))
+
+    def _publish(self, job, path):
+        """
+        Pindahkan path (sumber atau file .part) ke job.target tanpa menimpa file yang dibuat
+        program lain sejak nama dipilih: hard link (gagal dengan EEXIST) lalu unlink path.
+        Jika nama sudah terpakai, pilih nama unik baru (dicatat lagi lewat on_target) dan ulangi.
+        """
+        while True:
+            try:
+                self._link_noreplace(path, job.target)
+                return
+            except FileExistsError:
+                with self._target_lock:
+                    self._reserved_targets.discard(job.target)
+                job.target = job.fixed_target = None
+                self._pin_target(job)
+                job.target = job.fixed_target
+
+    def _link_noreplace(self, path, target):
+        try:
+            os.link(path, target, follow_symlinks=os.link not in os.supports_follow_symlinks)
+        except FileExistsError:
+            raise
+        except OSError as e:
+            if e.errno not in self.LINK_UNSUPPORTED_ERRNOS:
+                raise
+            # filesystem tanpa hard link (mis. FAT/exFAT): cek terakhir lalu rename
+            if os.path.lexists(target):
+                raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), target)
+            os.rename(path, target)
+            return
+        os.unlink(path)
+
+    @staticmethod
+    def _target_complete(job):
+        """
+        True jika job.target sudah berisi salinan sumber (ukuran sama, mtime dari copystat),
+        atau sumber sudah hilang sementara tujuan ada (move yang selesai sebelum crash).
+        """
+        try:
+            dst_st = os.stat(job.target)
+        except OSError:
+            return False
+        try:
+            src_st = os.stat(job.src)
+        except FileNotFoundError:
+            job.bytes_total = dst_st.st_size
+            return True
+        except OSError:
+            return False
+        if dst_st.st_size != src_st.st_size or abs(dst_st.st_mtime - src_st.st_mtime) >= 2:
+            return False
+        job.bytes_total = src_st.st_size
+        return True
+
+    def _copy_with_progress(self, job):
+        """
+        Copy ke file .part lalu rename, jadi tidak ada file tujuan setengah jadi.
+        Coba strategi dari yang tercepat; strategi yang tidak didukung filesystem
+        dilewati dan hasilnya diingat per pasangan device sumber/tujuan.
+        """
+        job.bytes_total = os.path.getsize(job.src)
+        job.bytes_done = 0
+        part = job.target + ".osmifo-part"
+        try:
+            with open(job.src, "rb") as fsrc, open(part, "wb") as fdst:
+                dev_key = (os.fstat(fsrc.fileno()).st_dev, os.fstat(fdst.fileno()).st_dev)
+                cached = self._copy_strategy.get(dev_key)
+                start = self.COPY_STRATEGIES.index(cached) if cached in self.COPY_STRATEGIES else 0
+                for method in self.COPY_STRATEGIES[start:]:
+                    copier = getattr(self, "_copy_" + method)
+                    try:
+                        if copier(job, fsrc, fdst) is False:
+                            continue
+                    except OSError as e:
+                        if e.errno not in (errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP,
+                                           errno.ENOTTY, errno.EBADF, errno.EPERM) or job.bytes_done:
+                            raise
+                        continue
+                    job.method = method
+                    self._copy_strategy[dev_key] = method
+                    break
+                fdst.flush()
+                written = os.fstat(fdst.fileno()).st_size
+                if written != job.bytes_total:
+                    # jangan pernah rename file tujuan yang tidak lengkap (sumber lalu dihapus saat move)
+                    raise OSError(errno.EIO, f"ukuran salinan {written} byte, seharusnya {job.bytes_total} byte", job.src)
+            shutil.copystat(job.src, part)
+            self._publish(job, part)
+        except BaseException:
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+            raise
+
+    def _report_progress(self, job, nbytes, state):
+        if job.cancel_requested:
+            raise TransferCancelled(job.name)
+        job.bytes_done += nbytes
+        now = time.monotonic()
+        if now - state[0] > 0.1:
+            state[0] = now
+            self._notify(job)
+
+    def _copy_reflink(self, job, fsrc, fdst):
+        # copy-on-write: instan, tidak memakai ruang tambahan sampai salah satu file diubah
+        if fcntl is None:
+            return False
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        job.bytes_done = job.bytes_total
+        return True
+
+    def _copy_kernel(self, job, fsrc, fdst, call):
+        state = [0.0]
+        offset = 0
+        while offset < job.bytes_total:
+            n = call(fsrc.fileno(), fdst.fileno(), offset, min(TRANSFER_KERNEL_CHUNK, job.bytes_total - offset))
+            if n == 0:
+                # EOF sebelum bytes_total: sumber terpotong/berubah saat disalin
+                raise OSError(errno.EIO, f"sumber berakhir di byte {offset} dari {job.bytes_total}", job.src)
+            offset += n
+            self._report_progress(job, n, state)
+        return True
+
+    def _copy_copy_file_range(self, job, fsrc, fdst):
+        if not hasattr(os, "copy_file_range"):
+            return False
+        return self._copy_kernel(job, fsrc, fdst,
+                                 lambda i, o, off, n: os.copy_file_range(i, o, n, off, off))
+
+    def _copy_sendfile(self, job, fsrc, fdst):
+        if not hasattr(os, "sendfile") or sys.platform != "linux":
+            return False
+        return self._copy_kernel(job, fsrc, fdst, lambda i, o, off, n: os.sendfile(o, i, off, n))
+
+    def _copy_stream(self, job, fsrc, fdst):
+        state = [0.0]
+        fsrc.seek(0)
+        fdst.seek(0)
+        fdst.truncate()
+        job.bytes_done = 0
+        while True:
+            if job.cancel_requested:
+                raise TransferCancelled(job.name)
+            buf = fsrc.read(TRANSFER_CHUNK)
+            if not buf:
+                break
+            fdst.write(buf)
+            self._report_progress(job, len(buf), state)
+        return True
+
+
+class ParallelDirScanner:
+    """
+    Jelajahi pohon folder dengan beberapa thread os.scandir sekaligus: setiap folder yang
+    ditemukan masuk antrean bersama, jadi latency I/O tiap folder tumpang tindih.
+    on_entry(relpath, dir_entry) dipanggil dari thread worker untuk setiap file.
+    Symlink folder, folder tersembunyi (".xxx") dan folder di exclude (mis. folder tujuan
+    yang ada di dalam folder sumber) tidak dimasuki.
+    """
+    def __init__(self, root, on_entry, should_stop=lambda: False, workers=RECURSIVE_SCAN_WORKERS, exclude=()):
+        self.root = root
+        self.on_entry = on_entry
+        self.should_stop = should_stop
+        self.workers = max(1, workers)
+        self.exclude = relative_subdirs(root, exclude)
+        self.errors = []
+        self._cond = threading.Condition()
+        self._dirs = [""]
+        self._active = 0
+
+    def run(self):
+        """Blok sampai seluruh pohon selesai dijelajahi (atau should_stop())."""
+        threads = [threading.Thread(target=self._worker) for _ in range(self.workers)]
+        for t in threads:
+            t.daemon = True
+            t.start()
+        for t in threads:
+            t.join()
+        return self.errors
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._dirs and self._active:
+                    self._cond.wait()
+                if not self._dirs or self.should_stop():
+                    self._cond.notify_all()
+                    return
+                rel_dir = self._dirs.pop()
+                self._active += 1
+            found = []
+            try:
+                with os.scandir(os.path.join(self.root, rel_dir) if rel_dir else self.root) as it:
+                    for de in it:
+                        rel = os.path.join(rel_dir, de.name) if rel_dir else de.name
+                        try:
+                            if de.is_dir(follow_symlinks=False):
+                                if not de.name.startswith(".") and os.path.normcase(rel) not in self.exclude:
+                                    found.append(rel)
+                                continue
+                        except OSError:
+                            continue
+                        self.on_entry(rel, de)
+            except OSError as e:
+                self.errors.append(e)
+            with self._cond:
+                self._dirs.extend(found)
+                self._active -= 1
+                self._cond.notify_all()
+
+
+class InotifyWatcher:
+    """
+    Pantau folder sumber lewat inotify (Linux, via ctypes) dan laporkan perubahan file:
+    on_events([(kind, relpath), ...]) dengan kind "add" | "remove" | "remove_dir" | "overflow".
+    File baru dilaporkan saat selesai ditulis (IN_CLOSE_WRITE) atau dipindah masuk (IN_MOVED_TO),
+    jadi file yang masih ditulis kamera tethered tidak ikut dibuka setengah jadi.
+    """
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    EVENT = struct.Struct("iIII")
+
+    _libc = None
+
+    @classmethod
+    def available(cls):
+        if not sys.platform.startswith("linux"):
+            return False
+        if cls._libc is None:
+            try:
+                cls._libc = ctypes.CDLL(None, use_errno=True)
+                cls._libc.inotify_init1
+            except (OSError, AttributeError):
+                cls._libc = False
+        return bool(cls._libc)
+
+    def __init__(self, root, on_events, recursive=False, exclude=()):
+        self.root = root
+        self.on_events = on_events
+        self.recursive = recursive
+        self.exclude = relative_subdirs(root, exclude)   # subfolder yang tidak dipantau (folder tujuan)
+        self._fd = -1
+        self._wd_dir = {}         # watch descriptor -> folder relatif ("" = root)
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if not self.available():
+            return False
+        fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if fd < 0:
+            return False
+        self._fd = fd
+        if not self._add_watch(""):
+            os.close(fd)
+            self._fd = -1
+            return False
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stopped.set()
+
+    def _add_watch(self, rel_dir):
+        path = os.path.join(self.root, rel_dir) if rel_dir else self.root
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            return False
+        self._wd_dir[wd] = rel_dir
+        return True
+
+    def _skip_dir(self, rel_dir):
+        return os.path.basename(rel_dir).startswith(".") or os.path.normcase(rel_dir) in self.exclude
+
+    def _watch_tree(self, rel_dir, events=None):
+        """Pasang watch untuk semua subfolder; events (opsional) diisi file yang sudah ada di dalamnya."""
+        stack = [rel_dir]
+        while stack:
+            current = stack.pop()
+            if current and not self._add_watch(current):
+                continue
+            try:
+                with os.scandir(os.path.join(self.root, current) if current else self.root) as it:
+                    for de in it:
+                        rel = os.path.join(current, de.name) if current else de.name
+                        try:
+                            if de.is_dir(follow_symlinks=False):
+                                if not self._skip_dir(rel):
+                                    stack.append(rel)
+                            elif events is not None:
+                                events.append(("add", rel))
+                        except OSError:
+                            pass
+            except OSError:
+                pass
+
+    def _run(self):
+        if self.recursive:
+            self._watch_tree("")
+        buf_size = 64 * 1024
+        pending = []
+        last_flush = time.monotonic()
+        try:
+            while not self._stopped.is_set():
+                ready, _, _ = select.select([self._fd], [], [], WATCH_BATCH_INTERVAL)
+                if ready:
+                    try:
+                        data = os.read(self._fd, buf_size)
+                    except BlockingIOError:
+                        data = b""
+                    self._parse(data, pending)
+                now = time.monotonic()
+                if pending and (not ready or now - last_flush > WATCH_BATCH_INTERVAL):
+                    events, pending = pending, []
+                    last_flush = now
+                    self.on_events(events)
+        except OSError:
+            self.on_events([("overflow", None)])
+        finally:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _parse(self, data, out):
+        offset = 0
+        while offset + self.EVENT.size <= len(data):
+            wd, mask, _cookie, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                out.append(("overflow", None))
+                continue
+            if mask & self.IN_IGNORED:
+                self._wd_dir.pop(wd, None)
+                continue
+            rel_dir = self._wd_dir.get(wd)
+            if rel_dir is None:
+                continue
+            if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                if rel_dir == "":
+                    out.append(("overflow", None))   # folder sumber sendiri hilang -> scan ulang
+                continue
+            rel = os.path.join(rel_dir, os.fsdecode(name)) if rel_dir else os.fsdecode(name)
+            if mask & self.IN_ISDIR:
+                if not self.recursive or self._skip_dir(rel):
+                    continue
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self._watch_tree(rel, out)
+                elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                    out.append(("remove_dir", rel))
+                continue
+            if mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                out.append(("add", rel))
+            elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                out.append(("remove", rel))
+
+
+class DestinationNameIndex:
+    """
+    Index nama file per folder tujuan: set nama yang terpakai + suffix " (n)" tertinggi per nama.
+    Dibangun sekali dengan os.scandir, lalu diperbarui setiap kali nama diklaim, jadi memilih
+    nama unik tidak perlu os.path.exists berulang (mahal di NAS). Nama yang sudah diklaim tetap
+    tercatat walau transfernya gagal -> paling buruk ada lompatan nomor suffix.
+    """
+    SUFFIX_RE = re.compile(r"^(.*) \((\d+)\)$")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dirs = {}   # dest_dir -> (set nama, {(base, ext): suffix tertinggi})
+
+    @staticmethod
+    def _key(name):
+        return os.path.normcase(name)
+
+    def _load(self, dest_dir):
+        entry = self._dirs.get(dest_dir)
+        if entry is None:
+            entry = (set(), {})
+            try:
+                with os.scandir(dest_dir) as it:
+                    for de in it:
+                        self._note(entry, de.name)
+            except OSError:
+                pass
+            self._dirs[dest_dir] = entry
+        return entry
+
+    def _note(self, entry, name):
+        names, highest = entry
+        names.add(self._key(name))
+        stem, ext = os.path.splitext(name)
+        m = self.SUFFIX_RE.match(stem)
+        base, n = (m.group(1), int(m.group(2))) if m else (stem, 1)
+        k = (self._key(base), self._key(ext))
+        if highest.get(k, 0) < n:
+            highest[k] = n
+
+    def claim(self, dest_dir, filename, reserved=()):
+        """Pilih & catat nama unik di dest_dir: filename, atau 'base (n).ext' dengan n = tertinggi + 1."""
+        with self._lock:
+            entry = self._load(dest_dir)
+            names, highest = entry
+            base, ext = os.path.splitext(filename)
+            candidate = os.path.join(dest_dir, filename)
+            if self._key(filename) in names or candidate in reserved:
+                n = max(highest.get((self._key(base), self._key(ext)), 1), 1) + 1
+                while True:
+                    name = f"{base} ({n}){ext}"
+                    candidate = os.path.join(dest_dir, name)
+                    if self._key(name) not in names and candidate not in reserved:
+                        break
+                    n += 1
+            self._note(entry, os.path.basename(candidate))
+            return candidate
+
+    def note(self, dest_dir, filename):
+        """Catat nama yang ternyata sudah ada (mis. ditulis program lain)."""
+        with self._lock:
+            self._note(self._load(dest_dir), filename)
+
+    def forget(self, dest_dir=None):
+        """Buang index dest_dir (None = semua); dibangun ulang dari disk saat claim berikutnya."""
+        with self._lock:
+            if dest_dir is None:
+                self._dirs.clear()
+            else:
+                self._dirs.pop(dest_dir, None)
+
+
+class DecisionJournal:
+    """
+    Write-ahead journal keputusan Mode Tunda (JSON lines, satu file per folder sumber).
+    Hotkey hanya menambah record "decide" (di-fsync); file baru dipindah saat commit.
+    Record: decide {id, src, name, dest, copy} | target {id, target} | done {id} | drop {id}.
+    Path tujuan dicatat (target) sebelum transfer, jadi commit yang terputus bisa dilanjutkan
+    tanpa menyalin dua kali. Baris terakhir yang terpotong (crash saat menulis) diabaikan.
+    File ditulis ulang (hanya keputusan yang masih tertunda) setelah JOURNAL_COMPACT_RECORDS record usang.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = OrderedDict()     # id -> dict keputusan yang belum selesai
+        self._next_id = 1
+        self._records = 0                # jumlah baris di file journal
+        self._load()
+
+    @staticmethod
+    def path_for(source_dir, root=None):
+        if root is None:
+            state_home = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+            root = os.path.join(state_home, "osmifo", "journal")
+        digest = hashlib.md5(os.path.abspath(source_dir).encode("utf-8")).hexdigest()
+        return os.path.join(root, digest + ".jsonl")
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+        if data and not data.endswith(b"\n"):
+            # buang ekor yang terpotong supaya record berikutnya tidak tersambung ke sana
+            data = data[:data.rfind(b"\n") + 1]
+            with open(self.path, "r+b") as f:
+                f.truncate(len(data))
+        for line in data.decode("utf-8", "replace").splitlines():
+            self._records += 1
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(rec, dict):
+                self._apply(rec)
+
+    def _apply(self, rec):
+        op, jid = rec.get("op"), rec.get("id")
+        if op == "decide":
+            if not isinstance(jid, int) or isinstance(jid, bool):
+                return   # record rusak; id wajib bilangan bulat
+            self.entries[jid] = {k: rec.get(k) for k in ("id", "src", "name", "dest", "copy")}
+            self.entries[jid]["target"] = None
+            self._next_id = max(self._next_id, jid + 1)
+        elif op == "target" and jid in self.entries:
+            self.entries[jid]["target"] = rec.get("target")
+        elif op in ("done", "drop"):
+            self.entries.pop(jid, None)
+
+    def _append(self, records, sync=True):
+        if not records:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(rec, ensure_ascii=False) + "\n" for rec in records))
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+        self._records += len(records)
+        for rec in records:
+            self._apply(rec)
+
+    def decide(self, items, dest, copy):
+        """items: [(src, name), ...] -> list id keputusan."""
+        with self._lock:
+            records = []
+            for src, name in items:
+                records.append({"op": "decide", "id": self._next_id + len(records), "src": src,
+                                "name": name, "dest": dest, "copy": bool(copy)})
+            self._append(records)
+            return [rec["id"] for rec in records]
+
+    def set_targets(self, pairs):
+        """pairs: [(id, target), ...] -> dicatat (fsync) sebelum transfer dimulai."""
+        with self._lock:
+            self._append([{"op": "target", "id": jid, "target": target} for jid, target in pairs])
+
+    def mark_done(self, ids):
+        # tanpa fsync: record done yang hilang saat crash hanya membuat resume memeriksa ulang file
+        with self._lock:
+            self._append([{"op": "done", "id": jid} for jid in ids if jid in self.entries], sync=False)
+            self._maybe_compact()
+
+    def drop(self, ids):
+        with self._lock:
+            self._append([{"op": "drop", "id": jid} for jid in ids if jid in self.entries])
+            self._maybe_compact()
+
+    def pending(self):
+        with self._lock:
+            return [dict(e) for e in self.entries.values()]
+
+    def pending_names(self):
+        with self._lock:
+            return {e["name"] for e in self.entries.values()}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _live_records(self):
+        records = []
+        for e in self.entries.values():
+            records.append({"op": "decide", "id": e["id"], "src": e["src"], "name": e["name"],
+                            "dest": e["dest"], "copy": e["copy"]})
+            if e["target"]:
+                records.append({"op": "target", "id": e["id"], "target": e["target"]})
+        return records
+
+    def _maybe_compact(self):
+        """Kosong -> hapus file; banyak record usang -> tulis ulang atomik berisi yang tertunda saja."""
+        if not self.entries:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self._records = 0
+            return
+        live = len(self.entries) + sum(1 for e in self.entries.values() if e["target"])
+        if self._records - live < JOURNAL_COMPACT_RECORDS:
+            return
+        records = self._live_records()
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write("".join(json.dumps(rec, ensure_ascii=False) + "\n" for rec in records))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except OSError:
+            return
+        self._records = len(records)
+
+
+class FreedesktopThumbnailStore:
+    """
+    Cache thumbnail persisten sesuai spesifikasi freedesktop (~/.cache/thumbnails).
+    Thumbnail dicari/ditulis per ukuran (normal=128, large=256, ...) dengan nama md5(URI).png
+    dan divalidasi lewat tEXt Thumb::URI + Thumb::MTime, jadi bisa dipakai bersama file manager.
+    """
+    FLAVORS = (("normal", 128), ("large", 256), ("x-large", 512), ("xx-large", 1024))
+    FAIL_DIR = os.path.join("fail", "osmifo-5")
+    # karakter yang tidak di-escape GLib (g_filename_to_uri) -> hash URI sama dengan file manager
+    URI_SAFE = "/!$&'()*+,;=:@~"
+
+    def __init__(self, root=None):
+        if root is None:
+            cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+            root = os.path.join(cache_home, "thumbnails")
+        self.root = os.path.abspath(root)
+
+    @classmethod
+    def uri_for(cls, path):
+        path = os.path.abspath(path)
+        if os.name == "nt":
+            return pathlib.Path(path).as_uri()
+        return "file://" + urllib.parse.quote(os.fsencode(path), safe=cls.URI_SAFE)
+
+    @classmethod
+    def flavor_for(cls, size):
+        """Flavor terkecil yang cukup besar untuk size (w, h)."""
+        edge = max(size)
+        for name, px in cls.FLAVORS:
+            if edge <= px:
+                return name, px
+        return cls.FLAVORS[-1]
+
+    def _thumb_file(self, flavor, uri):
+        return os.path.join(self.root, flavor, hashlib.md5(uri.encode("utf-8")).hexdigest() + ".png")
+
+    def _is_inside_store(self, path):
+        return os.path.abspath(path).startswith(self.root + os.sep)
+
+    @staticmethod
+    def _matches(im, uri, mtime):
+        text = getattr(im, "text", None) or im.info
+        if text.get("Thumb::URI") != uri:
+            return False
+        try:
+            return int(float(text.get("Thumb::MTime", ""))) == int(mtime)
+        except ValueError:
+            return False
+
+    def lookup(self, path, size):
+        """Return PIL.Image thumbnail valid (>= size) dari cache, atau None."""
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        uri = self.uri_for(path)
+        flavor, _px = self.flavor_for(size)
+        names = [name for name, _ in self.FLAVORS]
+        for name in names[names.index(flavor):]:
+            tf = self._thumb_file(name, uri)
+            try:
+                with Image.open(tf) as im:
+                    if not self._matches(im, uri, mtime):
+                        continue
+                    im.load()
+                    return im.copy()
+            except Exception:
+                continue
+        return None
+
+    def save(self, path, im):
+        """Simpan im (sudah diperkecil ke ukuran flavor) sebagai thumbnail path. Gagal diam-diam."""
+        if self._is_inside_store(path):
+            return
+        try:
+            st = os.stat(path)
+            uri = self.uri_for(path)
+            flavor, _px = self.flavor_for(im.size)
+            self._write_png(self._thumb_file(flavor, uri), im, uri, st)
+        except Exception:
+            pass
+
+    def has_failed(self, path):
+        try:
+            mtime = os.stat(path).st_mtime
+            uri = self.uri_for(path)
+            with Image.open(self._thumb_file(self.FAIL_DIR, uri)) as im:
+                return self._matches(im, uri, mtime)
+        except Exception:
+            return False
+
+    def mark_failed(self, path):
+        try:
+            st = os.stat(path)
+            uri = self.uri_for(path)
+            self._write_png(self._thumb_file(self.FAIL_DIR, uri), Image.new("RGBA", (1, 1)), uri, st)
+        except Exception:
+            pass
+
+    def _write_png(self, target, im, uri, st):
+        folder = os.path.dirname(target)
+        os.makedirs(folder, mode=0o700, exist_ok=True)
+        if im.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+            im = im.convert("RGB")
+        info = PngInfo()
+        info.add_text("Thumb::URI", uri)
+        info.add_text("Thumb::MTime", str(int(st.st_mtime)))
+        info.add_text("Thumb::Size", str(st.st_size))
+        info.add_text("Software", "OSMIFO v5")
+        # tulis ke file sementara lalu rename atomik (spesifikasi: jangan ada thumbnail setengah jadi)
+        fd, tmp = tempfile.mkstemp(prefix="osmifo-", suffix=".png", dir=folder)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                im.save(f, "PNG", pnginfo=info)
+            os.chmod(tmp, 0o600)
+            os.replace(tmp, target)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+
 class PhotoSorterApp:
-    def __init__(self, root):
+    def __init__(self, root, cache_budget_bytes=None):
         # If customtkinter available and it's a CTk root, use it; otherwise plain tk root
         self.root = root
         self.root.title("OSMIFO - Aplikasi Pemilah Foto by OSMIB Eduvasi v5")
@@ -112,9 +2598,25 @@ class PhotoSorterApp:
         # State
         self.source_dir = ""
         self.dest_dirs = []
-        self.image_list = []
+        self.image_list = FileTable()   # nama relatif + path/ukuran/mtime dari scandir (lihat FileTable)
+        self._rescan_stats = {}
+        self.catalog = MetadataCatalog.open_default()   # None jika sqlite3 tidak tersedia
+        self._catalog_generation = 0
+        self._scan_generation = 0
+        self._scanning = False
+        self.recursive_mode = tk.BooleanVar(value=False)  # ikut scan subfolder (DCIM/100MSDCF, ...)
+        self.sort_by_capture = tk.BooleanVar(value=False)  # urut waktu ambil EXIF (fallback nama file)
+        self._sort_keys = {}        # nama -> kunci urut waktu ambil (untuk menyisipkan file baru)
+        self._sort_generation = 0
+        self._rescanning = False
+        self.source_watcher = None  # InotifyWatcher: perubahan folder sumber diterapkan incremental
+        self._watch_generation = 0
+        self._source_excludes = frozenset()  # folder tujuan di dalam folder sumber (relatif), tidak di-scan
+        self._deferred_source_events = []    # event inotify yang datang selama scan, diterapkan setelah _on_scan_done
         self.current_index = 0
         self.copy_mode = tk.BooleanVar(value=False)  # central source of truth for copy/move
+        self.deferred_mode = tk.BooleanVar(value=False)  # Mode Tunda: hotkey hanya dicatat di journal
+        self.journal = None
         self.in_gallery_mode = False
 
         # Zoom state
@@ -123,12 +2625,24 @@ class PhotoSorterApp:
         self.zoom_min = 0.2
         self.zoom_max = 8.0
         self.fit_mode = True        # True -> fit to window behavior (default)
-
-        # Cache: preview_cache stores PIL.Image previews (usually half_size for .arw)
-        self.preview_cache = {}   # path -> PIL.Image (preview)
-        self.full_cache = {}      # optional: path -> full PIL.Image (if loaded)
-        self.thumb_cache = {}
-        self.gallery_cache = {}
+        self._full_res_pending = set()  # path yang resolusi penuhnya sedang di-decode di background
+
+        # Cache: preview_cache stores PIL.Image previews (embedded JPEG / half_size for .arw)
+        # Semua tier dibatasi budget byte (LRU); default dari RAM tersedia, override via
+        # argumen cache_budget_bytes atau env OSMIFO_CACHE_MB.
+        budget = default_cache_budget() if cache_budget_bytes is None else cache_budget_bytes
+        self.preview_cache = ByteBudgetCache("preview", budget * CACHE_TIER_SHARES["preview"])   # path -> PIL.Image
+        self.full_cache = ByteBudgetCache("full", budget * CACHE_TIER_SHARES["full"])            # path -> full PIL.Image
+        self.thumb_cache = ByteBudgetCache("thumb", budget * CACHE_TIER_SHARES["thumb"])         # path -> PhotoImage
+        self.gallery_cache = ByteBudgetCache("gallery", budget * CACHE_TIER_SHARES["gallery"])   # path -> PhotoImage
+        # bitmap tampilan yang sudah di-scale: (path, ukuran sumber, ukuran target) -> PhotoImage.
+        # Ukuran target mewakili viewport + zoom, jadi kembali ke gambar / toggle Fit-100% tanpa resample.
+        self.render_cache = ByteBudgetCache("render", budget * CACHE_TIER_SHARES["render"])
+        # pyramid mip per gambar (aktif + prefetch): path -> ImagePyramid
+        self.pyramid_cache = ByteBudgetCache("pyramid", budget * CACHE_TIER_SHARES["pyramid"],
+                                             sizeof=lambda pyr: pyr.nbytes())
+        # persistent thumbnails shared with the desktop (~/.cache/thumbnails)
+        self.thumb_store = FreedesktopThumbnailStore()
 
         self.current_path = None
         self.current_pil = None
@@ -138,6 +2652,49 @@ class PhotoSorterApp:
         self._load_thread = None
         self._load_lock = threading.Lock()
         self._load_cancel = False
+        self._load_generation = 0
+
+        # Thumbnail gallery dibuat di background (yang terlihat dulu); PhotoImage dibuat di main thread
+        self._gallery_inbox = {}         # path -> PIL thumbnail siap dipasang
+        self._gallery_failed = set()
+        self.gallery_loader = PreviewPrefetcher(
+            lambda p, size, cancel: self._load_thumb_pil(p, GALLERY_THUMB_SIZE, should_cancel=cancel),
+            self._gallery_inbox,
+            on_done=lambda p, ok: self.root.after(0, lambda: self._on_gallery_thumb_done(p, ok)),
+            workers=GALLERY_THUMB_WORKERS,
+        )
+
+        # Cuplikan prev/next juga di-decode di background; label diperbarui saat PhotoImage siap
+        self._small_thumb_inbox = {}     # path -> PIL cuplikan siap dipasang
+        self.small_thumb_loader = PreviewPrefetcher(
+            lambda p, size, cancel: self._load_thumb_pil(p, SMALL_THUMB_SIZE, should_cancel=cancel),
+            self._small_thumb_inbox,
+            on_done=lambda p, ok: self.root.after(0, lambda: self._on_small_thumb_done(p, ok)),
+            workers=1,
+        )
+
+        # Move/copy dijalankan di background; hotkey hanya mencatat keputusan lalu lanjut
+        self.dest_names = DestinationNameIndex()
+        self.transfers = TransferQueue(
+            self.make_unique_path,
+            on_update=lambda job: self.root.after(0, lambda: self._on_transfer_update(job)),
+            workers=TRANSFER_WORKERS,
+            on_target=self._record_journal_target,
+        )
+        self._transfer_window = None
+
+        # Demosaic RAW di process pool (multi-core, bisa dibatalkan); None -> in-process
+        self.raw_pool = RawDecodePool() if RAWPY_AVAILABLE else None
+
+        # Prefetch next/prev previews; arah & kecepatan dari riwayat navigasi
+        self._nav_history = []          # [(timestamp, delta)]
+        self._last_display_index = None
+        self._prefetch_window = ()
+        self.prefetcher = PreviewPrefetcher(
+            self._prefetch_decode,
+            self.preview_cache,
+            on_done=lambda p, ok: self.root.after(0, lambda: self._on_prefetch_done(p, ok)),
+        )
 
         # Root layout
         self.root.grid_columnconfigure(0, weight=1)
@@ -178,6 +2735,35 @@ class PhotoSorterApp:
         self.source_label = tk.Label(top, text="Belum ada folder sumber yang dipilih", fg=MUTED, bg=DARK_BG, anchor="w")
         self.source_label.grid(row=0, column=2, sticky="ew", padx=(8, 14))
 
+        if CTK_AVAILABLE:
+            recursive_chk = ctk.CTkCheckBox(top, text="Termasuk subfolder", variable=self.recursive_mode,
+                                            command=self._on_recursive_mode_changed)
+        else:
+            recursive_chk = tk.Checkbutton(top, text="Termasuk subfolder", variable=self.recursive_mode,
+                                           command=self._on_recursive_mode_changed, bg=DARK_BG, fg=FG,
+                                           selectcolor=DARK_BG, activebackground=DARK_BG, activeforeground=FG,
+                                           highlightthickness=0, bd=0)
+        recursive_chk.grid(row=0, column=3, sticky="e", padx=(0, 14))
+
+        if CTK_AVAILABLE:
+            capture_chk = ctk.CTkCheckBox(top, text="Urut waktu ambil", variable=self.sort_by_capture,
+                                          command=self._on_sort_mode_changed)
+        else:
+            capture_chk = tk.Checkbutton(top, text="Urut waktu ambil", variable=self.sort_by_capture,
+                                         command=self._on_sort_mode_changed, bg=DARK_BG, fg=FG,
+                                         selectcolor=DARK_BG, activebackground=DARK_BG, activeforeground=FG,
+                                         highlightthickness=0, bd=0)
+        capture_chk.grid(row=0, column=4, sticky="e", padx=(0, 14))
+        ToolTip(capture_chk, "Urutkan berdasarkan waktu ambil EXIF (hanya header file dibaca); tanpa EXIF -> nama file.")
+
+        if CTK_AVAILABLE:
+            search_btn = ctk.CTkButton(top, text="🔎 Cari Katalog", command=self.open_catalog_search, width=130)
+        else:
+            search_btn = tk.Button(top, text="🔎 Cari Katalog", command=self.open_catalog_search,
+                                   bg=BTN_BG, fg=FG, activebackground=BTN_ACTIVE, activeforeground=FG)
+        search_btn.grid(row=0, column=5, sticky="e", padx=(0, 10))
+        ToolTip(search_btn, "Cari foto di folder sumber berdasarkan kamera, lensa atau tanggal ambil (katalog metadata).")
+
         self.source_tooltip = None
 
         # dest area
@@ -193,6 +2779,12 @@ class PhotoSorterApp:
             add_one_btn.pack(side="left", padx=(0, 6))
             add_multi_btn = ctk.CTkButton(row1, text="2b) Tambah Banyak Folder (Multi)", command=self.open_multi_dest_picker)
             add_multi_btn.pack(side="left")
+            queue_btn = ctk.CTkButton(row1, text="⏳ Antrean Transfer", command=self.open_transfer_window, width=160)
+            queue_btn.pack(side="left", padx=(12, 0))
+            deferred_chk = ctk.CTkCheckBox(row1, text="Mode Tunda", variable=self.deferred_mode)
+            deferred_chk.pack(side="left", padx=(12, 0))
+            self.commit_button = ctk.CTkButton(row1, text="✅ Commit (0)", command=self.commit_decisions, width=130)
+            self.commit_button.pack(side="left", padx=(6, 0))
         else:
             add_one_btn = tk.Button(row1, text="2) Tambah 1 Folder Tujuan (+)", command=self.add_dest_folder_single,
                                     bg=BTN_BG, fg=FG, activebackground=BTN_ACTIVE, activeforeground=FG)
@@ -200,6 +2792,17 @@ class PhotoSorterApp:
             add_multi_btn = tk.Button(row1, text="2b) Tambah Banyak Folder (Multi)", command=self.open_multi_dest_picker,
                                       bg=BTN_BG, fg=FG, activebackground=BTN_ACTIVE, activeforeground=FG)
             add_multi_btn.pack(side="left")
+            queue_btn = tk.Button(row1, text="⏳ Antrean Transfer", command=self.open_transfer_window,
+                                  bg=BTN_BG, fg=FG, activebackground=BTN_ACTIVE, activeforeground=FG)
+            queue_btn.pack(side="left", padx=(12, 0))
+            deferred_chk = tk.Checkbutton(row1, text="Mode Tunda", variable=self.deferred_mode, bg=DARK_BG, fg=FG,
+                                          selectcolor=DARK_BG, activebackground=DARK_BG, activeforeground=FG,
+                                          highlightthickness=0, bd=0)
+            deferred_chk.pack(side="left", padx=(12, 0))
+            self.commit_button = tk.Button(row1, text="✅ Commit (0)", command=self.commit_decisions,
+                                           bg=BTN_BG, fg=FG, activebackground=BTN_ACTIVE, activeforeground=FG)
+            self.commit_button.pack(side="left", padx=(6, 0))
+        ToolTip(deferred_chk, "Hotkey hanya mencatat keputusan (journal di disk); file dipindah sekaligus saat Commit.")
 
         self.dest_buttons_frame = tk.Frame(self.root, bg=DARK_BG)
         self.dest_buttons_frame.grid(row=2, column=0, sticky="ew", padx=10, pady=6)
@@ -217,7 +2820,8 @@ class PhotoSorterApp:
         self.image_canvas = tk.Canvas(self.image_frame, bg=PANEL_BG, highlightthickness=0)
         self.image_hbar = tk.Scrollbar(self.image_frame, orient="horizontal", command=self.image_canvas.xview)
         self.image_vbar = tk.Scrollbar(self.image_frame, orient="vertical", command=self.image_canvas.yview)
-        self.image_canvas.configure(xscrollcommand=self.image_hbar.set, yscrollcommand=self.image_vbar.set)
+        self.image_canvas.configure(xscrollcommand=lambda *a: self._on_image_scroll(self.image_hbar, *a),
+                                    yscrollcommand=lambda *a: self._on_image_scroll(self.image_vbar, *a))
 
         self.image_canvas.pack(fill="both", expand=True, side="left")
         self.image_vbar.pack(fill="y", side="right")
@@ -225,11 +2829,29 @@ class PhotoSorterApp:
 
         self.image_canvas_img_id = None
 
+        # tiled render (zoom tinggi): hanya tile yang memotong viewport yang di-resample
+        self._tiled = None          # dict state render tiled aktif, None = bitmap tunggal
+        self._tiles = {}            # (col, row) -> (canvas item id, PhotoImage, sudah LANCZOS?)
+        self._tile_update_pending = False
+
+        # redraw dua fase: draft cepat dulu, LANCZOS setelah input diam REFINE_IDLE_MS
+        self._render_generation = 0
+        self._refine_after_id = None
+        self._pending_refine = None  # (render_key, level image, target size) untuk bitmap tunggal
+
         # panning
         self._pan_start = None
         self.image_canvas.bind("<ButtonPress-1>", self._start_pan)
         self.image_canvas.bind("<B1-Motion>", self._do_pan)
 
+        # coalescing input: zoom/pan/resize dikumpulkan lalu diproses sekali per frame
+        self._frame_after_id = None
+        self._pending_zoom = 1.0        # faktor zoom kumulatif yang belum diterapkan
+        self._pending_pan = None        # posisi mouse terakhir saat drag
+        self._pending_resize = None     # ukuran canvas terbaru
+        self._canvas_size = None
+        self.image_canvas.bind("<Configure>", self._on_canvas_configure)
+
         # zoom with Ctrl+wheel
         self.root.bind_all("<Control-MouseWheel>", self._on_ctrl_mousewheel)
         self.root.bind_all("<Control-Button-4>", self._on_ctrl_mousewheel)
@@ -258,6 +2880,15 @@ class PhotoSorterApp:
         self.file_created_label = tk.Label(self.info_frame, text="Tanggal dibuat: —", anchor="w", justify="left", bg=DARK_BG, fg=FG)
         self.file_created_label.pack(anchor="nw", fill="x", pady=(6, 2))
 
+        self.file_taken_label = tk.Label(self.info_frame, text="Diambil: —", anchor="w", justify="left", bg=DARK_BG, fg=FG)
+        self.file_taken_label.pack(anchor="nw", fill="x", pady=(2, 2))
+
+        self.file_camera_label = tk.Label(self.info_frame, text="Kamera: —", anchor="w", justify="left", wraplength=340, bg=DARK_BG, fg=FG)
+        self.file_camera_label.pack(anchor="nw", fill="x", pady=(2, 2))
+
+        self.file_lens_label = tk.Label(self.info_frame, text="Lensa: —", anchor="w", justify="left", wraplength=340, bg=DARK_BG, fg=FG)
+        self.file_lens_label.pack(anchor="nw", fill="x", pady=(2, 2))
+
         self.file_path_label = tk.Label(self.info_frame, text="Path: —", anchor="w", justify="left", wraplength=340, fg="gray", bg=DARK_BG)
         self.file_path_label.pack(anchor="nw", fill="x", pady=(8, 2))
 
@@ -280,6 +2911,7 @@ class PhotoSorterApp:
 
         # gallery
         self.gallery_frame = None
+        self.gallery = None
 
         # nav area
         nav_outer = tk.Frame(self.root, pady=6, bg=DARK_BG)
@@ -390,31 +3022,57 @@ class PhotoSorterApp:
 
     # ------------------------------ Shortcuts ------------------------------
     def bind_shortcuts(self):
-        self.root.bind_all("<Left>", lambda e: self.go_back())
-        self.root.bind_all("<Right>", lambda e: self.go_next())
-        self.root.bind_all("<c>", lambda e: self.copy_mode.set(not self.copy_mode.get()))
-        self.root.bind_all("<C>", lambda e: self.copy_mode.set(not self.copy_mode.get()))
+        shortcut = self._shortcut
+        self.root.bind_all("<Left>", shortcut(lambda e: self.go_back()))
+        self.root.bind_all("<Right>", shortcut(lambda e: self.go_next()))
+        self.root.bind_all("<c>", shortcut(lambda e: self.copy_mode.set(not self.copy_mode.get())))
+        self.root.bind_all("<C>", shortcut(lambda e: self.copy_mode.set(not self.copy_mode.get())))
 
         try:
-            self.root.bind_all("=", lambda e: self.zoom_in())
-            self.root.bind_all("-", lambda e: self.zoom_out())
+            self.root.bind_all("=", shortcut(lambda e: self.zoom_in()))
+            self.root.bind_all("-", shortcut(lambda e: self.zoom_out()))
         except Exception:
             pass
 
         digit_map = [('1', 0), ('2', 1), ('3', 2), ('4', 3), ('5', 4),
                      ('6', 5), ('7', 6), ('8', 7), ('9', 8), ('0', 9)]
         for key, idx in digit_map:
-            self.root.bind_all(key, self.make_hotkey_handler(idx))
+            self.root.bind_all(key, shortcut(self.make_hotkey_handler(idx)))
 
-        self.root.bind_all("<Delete>", lambda e: self.delete_current_file())
-        self.root.bind_all("x", lambda e: self.delete_current_file())
-        self.root.bind_all("X", lambda e: self.delete_current_file())
+        self.root.bind_all("<Delete>", shortcut(lambda e: self.delete_current_file()))
+        self.root.bind_all("x", shortcut(lambda e: self.delete_current_file()))
+        self.root.bind_all("X", shortcut(lambda e: self.delete_current_file()))
+
+    def _shortcut(self, action):
+        """Bungkus handler bind_all: hotkey hanya berlaku di jendela utama, tidak saat mengetik."""
+        def handler(event):
+            if self._hotkey_target_ok(event):
+                return action(event)
+        return handler
+
+    def _hotkey_target_ok(self, event):
+        widget = getattr(event, "widget", None)
+        if widget is None or isinstance(widget, str):
+            return False   # widget Tk tanpa objek Python (mis. dialog file bawaan)
+        if isinstance(widget, (tk.Entry, tk.Text, tk.Spinbox)):
+            return False   # termasuk ttk.Entry/Combobox dan entry internal CTkEntry
+        try:
+            return widget.winfo_toplevel() is self.root
+        except Exception:
+            return False
 
     def make_hotkey_handler(self, dest_index_zero_based):
         def handler(_event):
-            if 0 <= dest_index_zero_based < len(self.dest_dirs) and self.image_list and not self.in_gallery_mode:
+            # di Gallery Mode hotkey hanya memproses seleksi; tanpa seleksi tidak melakukan apa-apa
+            if self.in_gallery_mode and not (self.gallery and self.gallery.selected):
+                return
+            if 0 <= dest_index_zero_based < len(self.dest_dirs) and self.image_list:
+                dest = self.dest_dirs[dest_index_zero_based]['path']
+                if self.in_gallery_mode:
+                    self.process_selection(dest)
+                    return
                 self.status_label.config(text=f"[HOTKEY] Proses ke folder #{dest_index_zero_based+1}")
-                self.process_file(self.dest_dirs[dest_index_zero_based]['path'])
+                self.process_file(dest)
             else:
                 self.status_label.config(text="Shortcut belum terisi folder tujuan tersebut.")
         return handler
@@ -473,45 +3131,64 @@ class PhotoSorterApp:
         self.gallery_frame = tk.Frame(self.main_area, bg=DARK_BG)
         self.gallery_frame.grid(row=0, column=0, columnspan=2, sticky="nsew")
 
-        canvas = tk.Canvas(self.gallery_frame, highlightthickness=0, bg=DARK_BG)
-        vbar = tk.Scrollbar(self.gallery_frame, orient="vertical", command=canvas.yview)
-        canvas.configure(yscrollcommand=vbar.set)
-
-        inner = tk.Frame(canvas, bg=DARK_BG)
-        canvas.create_window((0, 0), window=inner, anchor="nw")
-
-        def _on_config(_e):
-            canvas.configure(scrollregion=canvas.bbox("all"))
-        inner.bind("<Configure>", _on_config)
-
-        canvas.pack(side="left", fill="both", expand=True)
-        vbar.pack(side="right", fill="y")
-
-        max_cols = 5
-        for i, fname in enumerate(self.image_list):
-            path = os.path.normpath(os.path.join(self.source_dir, fname))
-            thumb = self._make_gallery_thumb(path)
-
-            cell = tk.Frame(inner, padx=6, pady=6, bg=DARK_BG)
-            cell.grid(row=i // max_cols, column=i % max_cols, sticky="n")
-
-            if thumb is not None:
-                btn = tk.Button(cell, image=thumb, command=lambda idx=i: self.open_image_from_gallery(idx), bg=DARK_BG)
-                btn.image = thumb
-                btn.pack()
-            else:
-                btn = tk.Button(cell, text="Preview\nunavailable", width=22, height=8, command=lambda idx=i: self.open_image_from_gallery(idx), bg=BTN_BG, fg=FG, activebackground=BTN_ACTIVE, activeforeground=FG)
-                btn.pack()
+        # virtual grid: hanya cell yang terlihat yang dibuat, sisanya di-recycle saat scroll
+        self.gallery = VirtualGalleryGrid(
+            self.gallery_frame,
+            len(self.image_list),
+            label_for=lambda i: self.image_list[i],
+            thumb_for=lambda i: self.gallery_cache.get(self._path_at(i)),
+            on_open=self.open_image_from_gallery,
+            on_view_changed=self._on_gallery_view_changed,
+            placeholder_for=lambda i: "Preview\nunavailable" if self._path_at(i) in self._gallery_failed else "Memuat…",
+            on_select_changed=lambda sel: self.update_status_bar(),
+        )
+        self.gallery.set_highlight(self.current_index)
+        self.gallery_frame.update_idletasks()
+        self.gallery.scroll_to_index(self.current_index)
+
+    def _on_gallery_view_changed(self, visible, overscan):
+        """Antre ulang thumbnail: yang terlihat dulu, lalu overscan; sisa antrean lama dibuang."""
+        paths = []
+        for i in list(visible) + list(overscan):
+            p = self._path_at(i)
+            if p not in self.gallery_cache and p not in self._gallery_failed:
+                paths.append(p)
+        self.gallery_loader.schedule(paths)
+
+    def _on_gallery_thumb_done(self, path, ok):
+        """Main thread: ubah PIL thumbnail jadi PhotoImage lalu pasang ke cell yang sedang menampilkan path."""
+        im = self._gallery_inbox.pop(path, None)
+        photo = None
+        if im is not None:
+            try:
+                photo = ImageTk.PhotoImage(im)
+                self.gallery_cache[path] = photo
+            except Exception:
+                ok = False
+        if ok is False:
+            self._gallery_failed.add(path)
+        if not self.gallery or (photo is None and ok is not False):
+            return
+        for index in self.gallery.indices_in_view():
+            if index < len(self.image_list) and self._path_at(index) == path:
+                self.gallery.set_cell_thumb(index, photo)
+                break
 
-            lbl = tk.Label(cell, text=fname, wraplength=GALLERY_THUMB_SIZE[0], justify="center", bg=DARK_BG, fg=FG)
-            lbl.pack(pady=(4, 0))
+    def open_image_from_gallery(self, index):
+        if not (0 <= index < len(self.image_list)):
+            return
+        self.current_index = index
+        self.close_gallery_mode()
+        self.display_current_image()
 
     def close_gallery_mode(self):
         if not self.in_gallery_mode:
             return
+        self.gallery_loader.cancel()
         if self.gallery_frame:
             self.gallery_frame.destroy()
             self.gallery_frame = None
+        self.gallery = None
         self.image_frame.grid()
         self.info_frame.grid()
         self.in_gallery_mode = False
@@ -524,71 +3201,204 @@ class PhotoSorterApp:
             pass
 
     def refresh_gallery_if_open(self):
-        if self.in_gallery_mode:
-            self.close_gallery_mode()
-            self.open_gallery_mode()
+        """Sinkronkan gallery dengan image_list tanpa membangun ulang (cell terlihat diisi ulang)."""
+        if self.in_gallery_mode and self.gallery:
+            self.gallery.set_count(len(self.image_list))
+            self.gallery.set_highlight(self.current_index)
+            self.gallery.rebind_visible()
+
+    def _after_item_removed(self, removed_index):
+        """Update tampilan setelah image_list.pop(removed_index): gallery digeser incremental, viewer pindah ke gambar aktif."""
+        if self.in_gallery_mode and self.gallery:
+            if not self.image_list:
+                self.close_gallery_mode()
+                self.display_current_image()
+                return
+            self.gallery.remove_index(removed_index)
+            self.gallery.set_highlight(self.current_index)
+            self.update_buttons_state()
+            self.update_status_bar()
+            return
+        self.display_current_image()
 
     # ------------------- Image loading helper (supports .arw via rawpy) -------------------
-    def _open_path_to_pil(self, image_path, fast_preview=True, allow_full=False):
+    def _extract_arw_embedded_jpeg(self, raw, min_edge=0, target_size=None):
+        """
+        Ambil JPEG tertanam (embedded preview kamera) dari container .arw yang sudah dibuka.
+        Return PIL.Image yang sudah diputar sesuai orientasi, atau None jika tidak ada /
+        lebih kecil dari min_edge (sisi terpanjang).
+        target_size: jika diisi, JPEG di-decode langsung di skala DCT yang cukup untuk ukuran itu.
+        """
+        try:
+            thumb = raw.extract_thumb()
+        except Exception:
+            # LibRawNoThumbnailError / LibRawUnsupportedThumbnailError / lainnya
+            return None
+        try:
+            if thumb.format == rawpy.ThumbFormat.JPEG:
+                im = Image.open(io.BytesIO(thumb.data))
+            elif thumb.format == rawpy.ThumbFormat.BITMAP:
+                im = Image.fromarray(thumb.data)
+            else:
+                return None
+
+            if max(im.width, im.height) < min_edge:
+                return None
+
+            # JPEG tertanam Sony biasanya tanpa tag Orientation -> pakai flip dari header RAW
+            try:
+                exif_orientation = im.getexif().get(0x0112, 1) or 1
+            except Exception:
+                exif_orientation = 1
+            flip = getattr(raw.sizes, "flip", 0) if exif_orientation == 1 else 0
+            quarter_turn = exif_orientation in (5, 6, 7, 8) or flip in (5, 6)
+            source_size = (im.height, im.width) if quarter_turn else im.size
+            if target_size and im.format == "JPEG":
+                tw, th = target_size
+                im.draft("RGB", (th, tw) if quarter_turn else (tw, th))
+            im.load()
+        except Exception:
+            return None
+
+        if exif_orientation != 1:
+            im = ImageOps.exif_transpose(im)
+        elif flip == 3:
+            im = im.transpose(Image.Transpose.ROTATE_180)
+        elif flip == 5:
+            im = im.transpose(Image.Transpose.ROTATE_90)
+        elif flip == 6:
+            im = im.transpose(Image.Transpose.ROTATE_270)
+        if im.mode != "RGB":
+            im = im.convert("RGB")
+        im.info["source_size"] = source_size
+        if target_size:
+            im = shrink_to_fit(im, target_size)
+        return im
+
+    def _open_path_to_pil(self, image_path, fast_preview=True, allow_full=False,
+                          min_embedded_edge=ARW_EMBEDDED_MIN_EDGE, target_size=None, should_cancel=None):
         """
         Return a PIL.Image for supported image_path.
         Supports normal images via PIL.Image.open and .arw via rawpy (if available).
-        - fast_preview=True uses half_size for .arw to speed up processing
+        - fast_preview=True uses the embedded camera JPEG for .arw (fallback: half_size demosaic)
         - allow_full=True attempts full-resolution output
-        Raises RuntimeError with informative message on failure.
+        - min_embedded_edge: embedded JPEG smaller than this is ignored (0 = accept any size)
+        - target_size=(w, h) decodes only the pixels needed to fit that box (JPEG draft/DCT
+          scaling, integer reduce(), reducing-gap resample). The original pixel size is kept
+          in im.info['source_size'].
+        - should_cancel: callable; RAW demosaic in the process pool is killed once it returns True
+        Raises RuntimeError with informative message on failure (RawDecodeCancelled if cancelled).
         """
         ext = os.path.splitext(image_path)[1].lower()
         if ext == ".arw":
             if not RAWPY_AVAILABLE:
                 raise RuntimeError("rawpy tidak terpasang — tidak bisa membuka file .arw. Install dengan: pip install rawpy")
+            half_size = fast_preview and not allow_full
             try:
+                im = None
                 with rawpy.imread(image_path) as raw:
-                    # half_size untuk preview cepat, full jika allow_full True
-                    rgb = raw.postprocess(
-                        use_camera_wb=True,
-                        no_auto_bright=True,
-                        output_bps=8,
-                        half_size=fast_preview and not allow_full,
-                        gamma=(2.2, 4.5)
-                    )
-                im = Image.fromarray(rgb)
+                    # jalur cepat: JPEG tertanam, tanpa demosaic
+                    if fast_preview and not allow_full:
+                        im = self._extract_arw_embedded_jpeg(raw, min_edge=min_embedded_edge,
+                                                             target_size=target_size)
+                        if im is not None:
+                            return im
+                    if self.raw_pool is None or not self.raw_pool.available:
+                        # half_size untuk preview cepat, full jika allow_full True
+                        rgb = raw.postprocess(half_size=half_size, **RAW_POSTPROCESS_ARGS)
+                        im = Image.fromarray(rgb)
+                if im is None:
+                    try:
+                        im = self.raw_pool.decode(image_path, half_size=half_size, should_cancel=should_cancel)
+                    except RawDecodePoolUnavailable:
+                        with rawpy.imread(image_path) as raw:
+                            im = Image.fromarray(raw.postprocess(half_size=half_size, **RAW_POSTPROCESS_ARGS))
+                if target_size:
+                    im = shrink_to_fit(im, target_size)
                 return im
+            except RawDecodeCancelled:
+                raise
             except Exception as e:
                 raise RuntimeError(f"Gagal memproses .arw: {e}")
         else:
             # normal image
             try:
                 with Image.open(image_path) as im:
-                    return im.copy()
+                    if not target_size:
+                        return im.copy()
+                    source_size = im.size
+                    if im.format == "JPEG":
+                        # DCT-domain scaling (1/2, 1/4, 1/8) langsung saat decode
+                        im.draft("RGB", tuple(target_size))
+                    im.load()
+                    im.info["source_size"] = source_size
+                    return shrink_to_fit(im, target_size)
             except Exception as e:
                 raise RuntimeError(f"Gagal membuka gambar: {e}")
 
-    def _make_gallery_thumb(self, image_path):
-        image_path = os.path.normpath(image_path)
-        if image_path in self.gallery_cache:
-            return self.gallery_cache[image_path]
-        try:
-            im = self._open_path_to_pil(image_path, fast_preview=True)
-            im.thumbnail(GALLERY_THUMB_SIZE, Image.Resampling.LANCZOS)
-            ph = ImageTk.PhotoImage(im)
-            self.gallery_cache[image_path] = ph
-            return ph
-        except Exception:
-            return None
+    def _load_thumb_pil(self, image_path, size, should_cancel=None):
+        """
+        PIL thumbnail yang muat di size: ambil dari cache freedesktop jika valid,
+        kalau tidak decode tereduksi lalu simpan ke cache untuk sesi/aplikasi lain.
+        Return None jika file tidak bisa di-decode.
+        """
+        store = self.thumb_store
+        im = store.lookup(image_path, size) if store else None
+        if im is None:
+            if store and store.has_failed(image_path):
+                return None
+            _flavor, px = FreedesktopThumbnailStore.flavor_for(size)
+            try:
+                im = self._open_path_to_pil(image_path, fast_preview=True, min_embedded_edge=0,
+                                            target_size=(px, px) if store else size,
+                                            should_cancel=should_cancel)
+            except RawDecodeCancelled:
+                raise
+            except Exception as e:
+                # hanya file yang memang rusak dicatat gagal; I/O sementara / rawpy hilang dicoba lagi nanti
+                if is_decode_error(e):
+                    if store:
+                        store.mark_failed(image_path)
+                    self._mark_decode_failed(image_path, e)
+                return None
+            if store:
+                store.save(image_path, im)
+        return shrink_to_fit(im, size)
 
     def _make_small_thumb(self, image_path):
+        """
+        PhotoImage cuplikan prev/next dari cache atau level kecil pyramid (tanpa baca disk).
+        None jika belum ada; decode/cache freedesktop dikerjakan small_thumb_loader di background.
+        """
         image_path = os.path.normpath(image_path)
         if image_path in self.thumb_cache:
             return self.thumb_cache[image_path]
         try:
-            im = self._open_path_to_pil(image_path, fast_preview=True)
-            im.thumbnail(SMALL_THUMB_SIZE, Image.Resampling.LANCZOS)
+            pyr = self.pyramid_cache.get(image_path)
+            if pyr is None:
+                return None
+            im = shrink_to_fit(pyr.smallest_covering(SMALL_THUMB_SIZE), SMALL_THUMB_SIZE)
             ph = ImageTk.PhotoImage(im)
             self.thumb_cache[image_path] = ph
             return ph
         except Exception:
             return None
 
+    def _on_small_thumb_done(self, path, ok):
+        """Main thread: PIL cuplikan dari small_thumb_loader -> PhotoImage, lalu perbarui prev/next."""
+        im = self._small_thumb_inbox.pop(path, None)
+        if im is None:
+            return
+        try:
+            self.thumb_cache[path] = ImageTk.PhotoImage(im)
+        except Exception:
+            return
+        if not self.in_gallery_mode and self.image_list:
+            neighbours = (self.current_index - 1, self.current_index + 1)
+            if any(0 <= i < len(self.image_list) and os.path.normpath(self.image_list.path_at(i)) == path
+                   for i in neighbours):
+                self.update_prev_next_thumbs()
+
     # ------------------------------ Sumber & Tujuan ------------------------------
     def select_source_folder(self):
         folder_path = filedialog.askdirectory(title="Pilih Folder Sumber Foto")
@@ -686,6 +3496,7 @@ class PhotoSorterApp:
             messagebox.showinfo("Info", "Tidak ada folder baru yang ditambahkan (mungkin duplikat/invalid).")
         self.render_dest_buttons()
         self.update_buttons_state()
+        self._on_dest_dirs_changed()
 
     def remove_dest_folder(self, idx):
         if not (0 <= idx < len(self.dest_dirs)):
@@ -695,8 +3506,10 @@ class PhotoSorterApp:
         if not ok:
             return
         self.dest_dirs.pop(idx)
+        self.dest_names.forget(d['path'])
         self.render_dest_buttons()
         self.update_buttons_state()
+        self._on_dest_dirs_changed()
 
     def render_dest_buttons(self):
         for w in self.dest_buttons_frame.winfo_children():
@@ -718,41 +3531,598 @@ class PhotoSorterApp:
             else:
                 prefix = ""
 
-            if CTK_AVAILABLE:
-                btn = ctk.CTkButton(cell, text=f"{prefix}Proses ke '{d['name']}'", command=lambda p=d['path']: self.process_file(p))
-            else:
-                btn = tk.Button(cell, text=f"{prefix}Proses ke '{d['name']}'", command=lambda p=d['path']: self.process_file(p), bg=BTN_BG, fg=FG, activebackground=BTN_ACTIVE, activeforeground=FG)
-            btn.pack(side="left", fill="x", expand=True)
+            if CTK_AVAILABLE:
+                btn = ctk.CTkButton(cell, text=f"{prefix}Proses ke '{d['name']}'", command=lambda p=d['path']: self.process_file(p))
+            else:
+                btn = tk.Button(cell, text=f"{prefix}Proses ke '{d['name']}'", command=lambda p=d['path']: self.process_file(p), bg=BTN_BG, fg=FG, activebackground=BTN_ACTIVE, activeforeground=FG)
+            btn.pack(side="left", fill="x", expand=True)
+
+            rm = tk.Button(cell, text="❌", width=3, command=lambda idx=i: self.remove_dest_folder(idx), bg=BTN_BG, fg=FG, activebackground=BTN_ACTIVE, activeforeground=FG)
+            rm.pack(side="left", padx=(6, 0))
+
+            d['button'] = btn
+            ToolTip(btn, lambda p=d['path']: self._dest_strategy_text(p))
+
+    def _dest_strategy_text(self, dest_dir):
+        """Ringkasan strategi transfer untuk folder tujuan (ditampilkan di tooltip tombol)."""
+        src = self.source_dir if self.source_dir and os.path.isdir(self.source_dir) else None
+        if src and TransferQueue.same_device(src, dest_dir):
+            move = "rename (satu filesystem, instan)"
+        else:
+            move = "copy + hapus sumber (beda device)"
+        copy = (src and self.transfers.strategy_for(src, dest_dir)) or "belum diketahui (dicoba: reflink → copy_file_range → sendfile → stream)"
+        return f"{dest_dir}\nMOVE: {move}\nCOPY: {copy}"
+
+    # ------------------------------ Manajemen Gambar ------------------------------
+    def _scan_excludes(self):
+        """Folder tujuan: di mode subfolder tidak ikut di-scan/dipantau walau ada di dalam folder sumber."""
+        return [d['path'] for d in self.dest_dirs]
+
+    def _on_dest_dirs_changed(self):
+        """Folder tujuan di dalam folder sumber bertambah/berkurang -> pasang ulang watcher & scan ulang."""
+        if not self.source_dir or not self.recursive_mode.get():
+            return
+        if relative_subdirs(self.source_dir, self._scan_excludes()) == self._source_excludes:
+            return
+        if self._scanning:
+            self.load_images()
+            return
+        self._start_source_watcher()
+        self._rescan_source("[SCAN] Daftar folder tujuan berubah, memindai ulang folder sumber…")
+
+    def load_images(self):
+        """Mulai scan folder sumber di background; gambar pertama ditampilkan begitu ditemukan."""
+        self._open_journal()
+        decided = self.journal.pending_names()
+
+        self._scan_generation += 1
+        self._scanning = True
+        self._rescanning = False
+        self._sort_generation += 1
+        self._sort_keys = {}
+        # isi folder tujuan bisa berubah di luar aplikasi; job yang masih jalan dilindungi reserved
+        self.dest_names.forget()
+        self._start_source_watcher()
+        self.image_list = FileTable(self.source_dir)
+        self._rescan_stats = {}
+        self.current_index = 0
+        self.prefetcher.cancel()
+        self._nav_history = []
+        self._last_display_index = None
+        self.thumb_cache.clear()
+        self.gallery_cache.clear()
+        self._gallery_failed.clear()
+        self.preview_cache.clear()
+        self.full_cache.clear()
+        self.render_cache.clear()
+        self.pyramid_cache.clear()
+        self.current_path = None
+        self.current_pil = None
+        self.current_photo = None
+        self.zoom_scale = 1.0
+        self.fit_mode = True
+
+        if self.in_gallery_mode:
+            self.close_gallery_mode()
+
+        self.image_canvas.delete("all")
+        self.image_canvas.create_text(10, 10, text="Memindai folder sumber…", anchor="nw", fill=FG)
+        self._clear_file_details()
+        self.update_buttons_state()
+        self.status_label.config(text="[SCAN] Memindai folder sumber…")
+
+        t = threading.Thread(target=self._scan_source_thread,
+                             args=(self._scan_generation, self.source_dir, decided, bool(self.recursive_mode.get()),
+                                   self._scan_excludes()))
+        t.daemon = True
+        t.start()
+
+    def _scan_source_thread(self, generation, source_dir, decided, recursive=False, exclude=()):
+        """
+        os.scandir streaming: kirim batch (nama, stat) ke UI, lalu daftar terurut di akhir.
+        Mode subfolder: nama berupa path relatif terhadap source_dir, dijelajahi paralel.
+        """
+        names, state = [], {"batch": [], "stats": {}, "flushed": time.monotonic()}
+        lock = threading.Lock()
+
+        def emit(name, de):
+            if not name.lower().endswith(SUPPORTED_EXTENSIONS) or name in decided:
+                return
+            try:
+                if not de.is_file():
+                    return
+                st = de.stat()
+            except OSError:
+                return
+            with lock:
+                names.append(name)
+                state["batch"].append(name)
+                state["stats"][name] = st
+                now = time.monotonic()
+                if len(state["batch"]) >= SCAN_BATCH_SIZE or (now - state["flushed"]) > SCAN_BATCH_INTERVAL:
+                    self._post_scan_batch(generation, state["batch"], state["stats"])
+                    state.update(batch=[], stats={}, flushed=now)
+
+        error = None
+        if recursive:
+            scanner = ParallelDirScanner(source_dir, emit, should_stop=lambda: generation != self._scan_generation,
+                                         exclude=exclude)
+            errors = scanner.run()
+            error = errors[0] if errors else None
+        else:
+            try:
+                with os.scandir(source_dir) as it:
+                    for de in it:
+                        if generation != self._scan_generation:
+                            return
+                        emit(de.name, de)
+            except OSError as e:
+                error = e
+        if generation != self._scan_generation:
+            return
+        self._post_scan_batch(generation, state["batch"], state["stats"])
+        names.sort()
+        self.root.after(0, lambda: self._on_scan_done(generation, names, error))
+
+    def _on_recursive_mode_changed(self):
+        if self.source_dir:
+            self.load_images()
+
+    def _start_source_watcher(self):
+        """(Re)start inotify untuk folder sumber; dipasang sebelum scan supaya tidak ada event yang terlewat."""
+        if self.source_watcher is not None:
+            self.source_watcher.stop()
+            self.source_watcher = None
+        self._watch_generation += 1
+        self._deferred_source_events = []
+        generation = self._watch_generation
+        exclude = self._scan_excludes()
+        self._source_excludes = relative_subdirs(self.source_dir, exclude)
+        watcher = InotifyWatcher(self.source_dir,
+                                 lambda events: self.root.after(0, lambda: self._on_source_events(generation, events)),
+                                 recursive=bool(self.recursive_mode.get()), exclude=exclude)
+        if watcher.start():
+            self.source_watcher = watcher
+
+    def _inflight_names(self):
+        """Nama yang sudah diputuskan tapi filenya masih di folder sumber (transfer berjalan / journal)."""
+        names = {job.name for job in self.transfers.jobs() if job.status in ("pending", "running")}
+        if self.journal is not None:
+            names |= self.journal.pending_names()
+        return names
+
+    def _on_source_events(self, generation, events):
+        """Main thread: terapkan event inotify ke image_list & cache tanpa reset posisi."""
+        if generation != self._watch_generation:
+            return
+        if self._scanning:
+            # image_list belum final (urutan batch scan): tunda supaya posisi sisip benar & tidak dobel
+            self._deferred_source_events.extend(events)
+            return
+        if any(kind == "overflow" for kind, _ in events):
+            self._rescan_source()
+            return
+        busy = self._inflight_names()
+        added = removed = 0
+        new_rows = []
+        header_rows = []   # mode urut waktu ambil: header dibaca di background, posisi menyusul
+        for kind, rel in events:
+            if kind == "remove_dir":
+                prefix = rel + os.sep
+                for name in [n for n in self.image_list if n.startswith(prefix)]:
+                    removed += self._remove_file_external(name)
+                continue
+            if not rel.lower().endswith(SUPPORTED_EXTENSIONS) or rel in busy:
+                continue
+            path = os.path.normpath(os.path.join(self.source_dir, rel))
+            if kind == "remove":
+                removed += self._remove_file_external(rel)
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            self._drop_caches_for(path)
+            if self.sort_by_capture.get():
+                header_rows.append((rel, path, st.st_size, st.st_mtime))
+            if rel in self.image_list:
+                self.image_list.set_stat(rel, st)
+                # file ditulis ulang -> tampilkan versi baru jika sedang dilihat
+                if not self.in_gallery_mode and self.current_path and os.path.normpath(self.current_path) == path:
+                    self.current_path = None
+                    self.display_current_image()
+                continue
+            self._reinsert_file(rel, st)
+            new_rows.append((path, st.st_size, st.st_mtime))
+            added += 1
+        if header_rows:
+            self._start_capture_key_refresh(header_rows)   # sekaligus mengisi katalog
+        elif new_rows:
+            self._start_catalog_pass(new_rows)
+        if added or removed:
+            self.update_status_bar()
+            self.status_label.config(text=f"[WATCH] Folder sumber berubah: +{added} / -{removed} file")
+
+    def _flush_deferred_source_events(self):
+        """Terapkan event yang ditunda selama scan; file yang sudah ditemukan scan jadi update biasa."""
+        if self._scanning or not self._deferred_source_events:
+            return
+        events, self._deferred_source_events = self._deferred_source_events, []
+        self._on_source_events(self._watch_generation, events)
+
+    def _remove_file_external(self, name):
+        """File hilang dari folder sumber (dihapus/dipindah program lain). Return 1 jika ada di daftar."""
+        try:
+            index = self.image_list.index(name)
+        except ValueError:
+            return 0
+        path = self.image_list.path_at(index)
+        self._drop_caches_for(path)
+        was_current = index == self.current_index
+        self.image_list.pop(index)
+        if index < self.current_index or (was_current and self.current_index >= len(self.image_list) and self.image_list):
+            self.current_index -= 1
+        if was_current or self.in_gallery_mode:
+            if was_current:
+                self.current_pil = None
+                self.current_photo = None
+                self.current_path = None
+            self._after_item_removed(index)
+        else:
+            self.update_buttons_state()
+            self.update_prev_next_thumbs()
+        return 1
+
+    def _rescan_source(self, message="[WATCH] Terlalu banyak perubahan, memindai ulang folder sumber…"):
+        """Fallback saat antrean inotify overflow: scan ulang penuh, posisi & cache tetap."""
+        if self._scanning:
+            return
+        self._scan_generation += 1
+        self._scanning = True
+        self._rescanning = True
+        self.status_label.config(text=message)
+        self._rescan_stats = {}
+        decided = self.journal.pending_names() if self.journal is not None else set()
+        t = threading.Thread(target=self._scan_source_thread,
+                             args=(self._scan_generation, self.source_dir, decided, bool(self.recursive_mode.get()),
+                                   self._scan_excludes()))
+        t.daemon = True
+        t.start()
+
+    # ------------------------------ Katalog metadata ------------------------------
+    def _start_catalog_pass(self, rows=None):
+        """Isi katalog untuk file yang belum tercatat (header saja) di thread background."""
+        if self.catalog is None:
+            return
+        if rows is None:
+            self._catalog_generation += 1
+            rows = self.image_list.rows_snapshot()
+        generation = self._catalog_generation
+        t = threading.Thread(target=self._catalog_pass_thread, args=(generation, rows))
+        t.daemon = True
+        t.start()
+
+    def _catalog_pass_thread(self, generation, rows):
+        rows = [r for r in rows if r[1] >= 0]
+        known = self.catalog.get_many(rows)
+        todo = [r for r in rows if r[0] not in known or not known[r[0]]["header_read"]]
+        batch = []
+        for i, (path, size, mtime) in enumerate(todo):
+            if generation != self._catalog_generation:
+                break
+            try:
+                meta = read_image_header(path)
+            except (OSError, ValueError):
+                continue
+            batch.append((path, size, mtime, meta))
+            if len(batch) >= CATALOG_BATCH or i == len(todo) - 1:
+                self._flush_catalog_batch(generation, batch, i + 1, len(todo))
+                batch = []
+        if batch:
+            self._flush_catalog_batch(generation, batch, len(todo), len(todo))
+
+    def _flush_catalog_batch(self, generation, batch, done, total):
+        try:
+            self.catalog.store_headers(batch)
+        except sqlite3.Error:
+            return
+        paths = {entry[0] for entry in batch}
+        self.root.after(0, lambda: self._on_catalog_batch(generation, paths, done, total))
+
+    def _on_catalog_batch(self, generation, paths, done, total):
+        """Main thread: perbarui panel detail jika gambar aktif baru saja masuk katalog."""
+        if self.current_path and os.path.normpath(self.current_path) in paths and not self.in_gallery_mode:
+            self._fill_file_details(self.current_path)
+        if generation == self._catalog_generation and total >= CATALOG_BATCH and done < total:
+            self.status_label.config(text=f"[KATALOG] Membaca metadata {done}/{total}…")
+        elif generation == self._catalog_generation and total >= CATALOG_BATCH:
+            self.status_label.config(text=f"[KATALOG] Metadata {total} file tersimpan.")
+
+    # ------------------------------ Urut waktu ambil ------------------------------
+    @staticmethod
+    def _capture_sort_key(name, capture_time, mtime=None):
+        """
+        Urut waktu ambil EXIF, lalu nama. File tanpa EXIF memakai waktu ubah file (format sama,
+        waktu lokal) supaya tetap di tempatnya di timeline; tanpa keduanya di belakang, urut nama.
+        """
+        base = os.path.basename(name)
+        if not capture_time and mtime and mtime > 0:
+            try:
+                capture_time = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S")
+            except (OverflowError, OSError, ValueError):
+                capture_time = None
+        return (0, capture_time, base, name) if capture_time else (1, "", base, name)
+
+    def _fallback_sort_key(self, name):
+        """Kunci urut untuk file yang header-nya belum dibaca: waktu ubah dari scan."""
+        st = self.image_list.stat_of(name)
+        return self._capture_sort_key(name, None, st[1] if st else None)
+
+    @staticmethod
+    def _mtime_of(path, mtime):
+        if mtime and mtime > 0:
+            return mtime
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def _on_sort_mode_changed(self):
+        if not self.image_list or self._scanning:
+            return   # urutan diterapkan setelah scan selesai
+        if self.sort_by_capture.get():
+            self._start_capture_sort()
+        else:
+            self._sort_generation += 1
+            self._sort_keys = {}
+            self._apply_order(sorted(self.image_list))
+            self.status_label.config(text="[SORT] Diurutkan berdasarkan nama file.")
+
+    def _start_capture_sort(self):
+        self._sort_generation += 1
+        generation = self._sort_generation
+        snapshot = list(zip(self.image_list, self.image_list.rows_snapshot()))
+        self.status_label.config(text=f"[SORT] Membaca waktu ambil {len(snapshot)} file…")
+        t = threading.Thread(target=self._capture_sort_thread, args=(generation, snapshot))
+        t.daemon = True
+        t.start()
+
+    def _capture_sort_thread(self, generation, snapshot):
+        """Waktu ambil dari katalog, sisanya header-only paralel; hasil header disimpan ke katalog."""
+        started = time.monotonic()
+        rows = [row for _, row in snapshot]
+        known = self.catalog.get_many([r for r in rows if r[1] >= 0]) if self.catalog else {}
+        times = {path: entry["capture_time"] for path, entry in known.items() if entry["header_read"]}
+        todo = iter([r for r in rows if r[0] not in times])
+        lock = threading.Lock()
+        parsed = []
+
+        def worker():
+            while generation == self._sort_generation:
+                with lock:
+                    row = next(todo, None)
+                if row is None:
+                    return
+                path, size, mtime = row
+                try:
+                    meta = read_image_header(path)
+                except (OSError, ValueError):
+                    meta = None
+                with lock:
+                    times[path] = meta["capture_time"] if meta else None
+                    if meta is not None and size >= 0:
+                        parsed.append((path, size, mtime, meta))
+
+        threads = [threading.Thread(target=worker) for _ in range(CAPTURE_SORT_WORKERS)]
+        for t in threads:
+            t.daemon = True
+            t.start()
+        for t in threads:
+            t.join()
+        if generation != self._sort_generation:
+            return
+        if self.catalog and parsed:
+            try:
+                for i in range(0, len(parsed), CATALOG_BATCH * 10):
+                    self.catalog.store_headers(parsed[i:i + CATALOG_BATCH * 10])
+            except sqlite3.Error:
+                pass
+        keys, without = {}, 0
+        for name, (path, _size, mtime) in snapshot:
+            capture_time = times.get(path)
+            if not capture_time:
+                without += 1
+                mtime = self._mtime_of(path, mtime)
+            keys[name] = self._capture_sort_key(name, capture_time, mtime)
+        order = sorted(keys, key=keys.__getitem__)
+        elapsed = time.monotonic() - started
+        self.root.after(0, lambda: self._on_capture_sort_done(generation, order, keys, len(parsed), without, elapsed))
+
+    def _on_capture_sort_done(self, generation, order, keys, parsed_count, without, elapsed):
+        if generation != self._sort_generation or not self.sort_by_capture.get():
+            return
+        self._sort_keys = keys
+        self._apply_order(order)
+        # file yang masuk selama sort berjalan ditaruh sementara di akhir -> baca header lalu pindahkan
+        late = [(name, self.image_list.path_at(i)) for i, name in enumerate(self.image_list) if name not in keys]
+        if late:
+            self._start_capture_key_refresh([(name, path, -1, 0.0) for name, path in late])
+        self.status_label.config(
+            text=f"[SORT] Diurutkan berdasarkan waktu ambil ({len(order)} file, {parsed_count} header dibaca, "
+                 f"{without} tanpa EXIF -> waktu ubah file, {elapsed:.1f} dtk)")
+
+    def _start_capture_key_refresh(self, items):
+        """items: [(nama, path, size, mtime)] file baru/berubah -> kunci waktu ambil dihitung di background."""
+        t = threading.Thread(target=self._capture_key_thread, args=(self._sort_generation, items))
+        t.daemon = True
+        t.start()
+
+    def _capture_key_thread(self, generation, items):
+        keys, parsed = {}, []
+        for name, path, size, mtime in items:
+            try:
+                meta = read_image_header(path)
+            except (OSError, ValueError):
+                meta = None
+            capture_time = meta["capture_time"] if meta else None
+            keys[name] = self._capture_sort_key(name, capture_time,
+                                                None if capture_time else self._mtime_of(path, mtime))
+            if meta is not None and size >= 0:
+                parsed.append((path, size, mtime, meta))
+        if self.catalog and parsed:
+            try:
+                self.catalog.store_headers(parsed)
+            except sqlite3.Error:
+                pass
+        self.root.after(0, lambda: self._on_capture_keys(generation, keys))
+
+    def _on_capture_keys(self, generation, keys):
+        """Main thread: simpan kunci baru; file yang kuncinya berubah dipindah ke posisi yang benar."""
+        if generation != self._sort_generation or not self.sort_by_capture.get() or not self._sort_keys:
+            return   # sort penuh belum selesai / sudah diganti -> file ini ditangani sort itu
+        changed = []
+        for name, key in keys.items():
+            if self._sort_keys.get(name) != key:
+                self._sort_keys[name] = key
+                if name in self.image_list:
+                    changed.append(name)
+        if len(changed) > CAPTURE_REPOSITION_MAX:
+            fallback = self._fallback_sort_key
+            self._apply_order(sorted(self.image_list, key=lambda n: self._sort_keys.get(n) or fallback(n)))
+            return
+        for name in changed:
+            self._reposition_file(name)
 
-            rm = tk.Button(cell, text="❌", width=3, command=lambda idx=i: self.remove_dest_folder(idx), bg=BTN_BG, fg=FG, activebackground=BTN_ACTIVE, activeforeground=FG)
-            rm.pack(side="left", padx=(6, 0))
+    def _reposition_file(self, name):
+        """Pindahkan name ke posisi sesuai kunci urut terbaru tanpa mengganti gambar aktif."""
+        try:
+            old = self.image_list.index(name)
+        except ValueError:
+            return
+        new = self._insert_position(name, skip=old)
+        if new == old:
+            return
+        self.image_list.move(old, new)
+        if self.current_index == old:
+            self.current_index = new
+        elif old < self.current_index <= new:
+            self.current_index -= 1
+        elif new <= self.current_index < old:
+            self.current_index += 1
+        if self.in_gallery_mode and self.gallery:
+            self.gallery.remove_indices([old])
+            self.gallery.insert_index(new)
+            self.gallery.set_highlight(self.current_index)
+        else:
+            self.update_prev_next_thumbs()
+            self._schedule_prefetch()
+        self.update_buttons_state()
+        self.update_status_bar()
 
-            d['button'] = btn
+    def _apply_order(self, order):
+        """Terapkan urutan baru ke image_list; gambar aktif tetap sama."""
+        current = self.image_list[self.current_index] if 0 <= self.current_index < len(self.image_list) else None
+        alive = set(self.image_list)
+        final = [n for n in order if n in alive]
+        if len(final) != len(alive):
+            seen = set(final)
+            final += sorted(n for n in alive if n not in seen)   # ditambahkan selama sort berjalan
+        self.image_list.reorder(final)
+        if current is not None:
+            self.current_index = self.image_list.index(current)
+        self._nav_history = []
+        self._last_display_index = self.current_index
+        if self.in_gallery_mode and self.gallery:
+            self.gallery.clear_selection()
+            self.refresh_gallery_if_open()
+        else:
+            self.update_prev_next_thumbs()
+            self._schedule_prefetch()
+        self.update_buttons_state()
+        self.update_status_bar()
 
-    # ------------------------------ Manajemen Gambar ------------------------------
-    def load_images(self):
+    def _insert_position(self, name, skip=None):
+        """
+        Posisi sisip sesuai mode urut aktif (nama file, atau kunci waktu ambil).
+        skip = index item name sendiri yang sedang dipindah (dianggap sudah dilepas dari daftar).
+        """
+        table = self.image_list
+        if not (self.sort_by_capture.get() and self._sort_keys):
+            if skip is None:
+                return bisect.bisect_left(table, name)
+            key, key_of = name, lambda other: other
+        else:
+            key = self._sort_keys.get(name)
+            if key is None:
+                key = self._fallback_sort_key(name)
+                self._sort_keys[name] = key
+            key_of = lambda other: self._sort_keys.get(other) or self._fallback_sort_key(other)
+        lo, hi = 0, len(table) - (skip is not None)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            other = table[mid + 1 if skip is not None and mid >= skip else mid]
+            if key_of(other) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _mark_decode_failed(self, image_path, exc):
+        """Catat di katalog bahwa file tidak bisa di-decode (hanya jika exc memang error decode)."""
+        if self.catalog is None or not is_decode_error(exc):
+            return
         try:
-            self.image_list = sorted([
-                f for f in os.listdir(self.source_dir)
-                if f.lower().endswith(SUPPORTED_EXTENSIONS)
-            ])
-        except Exception as e:
-            messagebox.showerror("Error", f"Gagal membaca folder sumber: {e}")
-            self.image_list = []
+            st = os.stat(image_path)
+            self.catalog.mark_failed(os.path.normpath(image_path), st.st_size, st.st_mtime)
+        except (OSError, sqlite3.Error):
+            pass
 
-        self.current_index = 0
-        self.thumb_cache.clear()
-        self.gallery_cache.clear()
-        self.preview_cache.clear()
-        self.full_cache.clear()
-        self.current_path = None
-        self.current_pil = None
-        self.current_photo = None
-        self.zoom_scale = 1.0
-        self.fit_mode = True
+    def _post_scan_batch(self, generation, batch, stats):
+        if batch:
+            self.root.after(0, lambda: self._on_scan_batch(generation, batch, stats))
 
-        if self.in_gallery_mode:
-            self.close_gallery_mode()
+    def _on_scan_batch(self, generation, batch, stats):
+        """Main thread: tambahkan batch ke image_list (urutan sementara = urutan scandir)."""
+        if generation != self._scan_generation:
+            return
+        if self._rescanning:
+            self._rescan_stats.update(stats)
+            return   # daftar lama tetap dipakai sampai hasil scan ulang lengkap
+        was_empty = not self.image_list
+        self.image_list.extend(batch, stats)
+        if was_empty:
+            self.current_index = 0
+            self.display_current_image()
+        else:
+            self.update_buttons_state()
+            if self.in_gallery_mode and self.gallery:
+                self.gallery.set_count(len(self.image_list))
+        self.status_label.config(text=f"[SCAN] Memindai… {len(self.image_list)} foto ditemukan")
+
+    def _on_scan_done(self, generation, sorted_names, error):
+        """Main thread: ganti ke urutan final tanpa memindah gambar yang sedang dilihat."""
+        if generation != self._scan_generation:
+            return
+        self._scanning = False
+        rescan, self._rescanning = self._rescanning, False
+        self.root.after(0, self._flush_deferred_source_events)
+        current = self.image_list[self.current_index] if 0 <= self.current_index < len(self.image_list) else None
+        if rescan:
+            busy = self._inflight_names()
+            final = [n for n in sorted_names if n not in busy]
+            self.image_list.reorder(final, self._rescan_stats)
+            self._rescan_stats = {}
+            current_gone = current is not None and current not in self.image_list
+            if current is not None:
+                self.current_index = min(bisect.bisect_left(final, current), max(0, len(final) - 1))
+            if current_gone:
+                self.current_path = None
+                self.current_pil = None
+                self.current_photo = None
+                if not self.in_gallery_mode and final:
+                    self.display_current_image()
+        if error is not None and not self.image_list:
+            messagebox.showerror("Error", f"Gagal membaca folder sumber: {error}")
 
         if not self.image_list:
             messagebox.showinfo("Kosong", "Tidak ada file foto yang ditemukan di folder ini.")
@@ -763,7 +4133,30 @@ class PhotoSorterApp:
             self.update_status_bar()
             return
 
-        self.display_current_image()
+        if not rescan:
+            # item yang sudah diproses selama scan tidak dimunculkan lagi; yang dikembalikan tetap ada
+            alive = set(self.image_list)
+            final = [n for n in sorted_names if n in alive]
+            if len(final) != len(alive):
+                final = sorted(alive)
+            self.image_list.reorder(final)
+            if current is not None:
+                self.current_index = bisect.bisect_left(final, current)
+        self._nav_history = []
+        self._last_display_index = self.current_index
+
+        if self.in_gallery_mode and self.gallery:
+            self.gallery.clear_selection()
+            self.refresh_gallery_if_open()
+        else:
+            self.update_prev_next_thumbs()
+            self._schedule_prefetch()
+        self.update_buttons_state()
+        self.update_status_bar()
+        if self.sort_by_capture.get():
+            self._start_capture_sort()   # sekaligus mengisi katalog
+        else:
+            self._start_catalog_pass()
 
     def _clear_file_details(self):
         self.file_name_label.config(text="Nama: —")
@@ -771,14 +4164,21 @@ class PhotoSorterApp:
         self.file_type_label.config(text="Tipe: —")
         self.file_resolution_label.config(text="Resolusi: —")
         self.file_created_label.config(text="Tanggal dibuat: —")
+        self.file_taken_label.config(text="Diambil: —")
+        self.file_camera_label.config(text="Kamera: —")
+        self.file_lens_label.config(text="Lensa: —")
         self.file_path_label.config(text="Path: —")
         self.prev_thumb_label.config(image='', text="— Prev —", fg=MUTED, bg=DARK_BG)
         self.prev_thumb_label.image = None
         self.next_thumb_label.config(image='', text="— Next —", fg=MUTED, bg=DARK_BG)
         self.next_thumb_label.image = None
 
-    def _render_current_image_fit(self):
-        """Render ulang gambar aktif agar pas di image_canvas sesuai mode (fit/manual)."""
+    def _render_current_image_fit(self, draft=False):
+        """
+        Render ulang gambar aktif agar pas di image_canvas sesuai mode (fit/manual).
+        draft=True (zoom/pan interaktif): resample NEAREST/BILINEAR sekarang, LANCZOS menyusul saat input diam.
+        """
+        self._cancel_refine()
         if not self.current_pil:
             return
 
@@ -798,19 +4198,41 @@ class PhotoSorterApp:
             target_w = int(iw * scale)
             target_h = int(ih * scale)
         else:
-            # Manual zoom
+            # Manual zoom, relatif ke ukuran asli: selama resolusi penuh masih di-decode
+            # di background, preview tereduksi di-upscale ke ukuran yang sama
             z = max(self.zoom_min, min(self.zoom_scale, self.zoom_max))
-            target_w = int(iw * z)
-            target_h = int(ih * z)
+            sw, sh = self._current_source_size()
+            target_w = int(sw * z)
+            target_h = int(sh * z)
 
-        try:
-            img = self.current_pil.copy()
-            if (img.width, img.height) != (target_w, target_h):
-                img = img.resize((max(1, target_w), max(1, target_h)), Image.Resampling.LANCZOS)
-            self.current_photo = ImageTk.PhotoImage(img)
-        except Exception as e:
-            print("[Error] render image:", e)
+        target_w, target_h = max(1, target_w), max(1, target_h)
+        if target_w * target_h > TILED_RENDER_FACTOR * cw * ch:
+            self._start_tiled_render(target_w, target_h, cw, ch)
             return
+        self._tiled = None
+        self._tiles = {}
+
+        render_key = (self.current_path, (iw, ih), (target_w, target_h))
+        photo = self.render_cache.get(render_key)
+        if photo is None:
+            try:
+                img, _level_scale = self._pyramid_for(self.current_path, self.current_pil).for_scale(target_w / iw)
+                level = img
+                if (img.width, img.height) != (target_w, target_h):
+                    if draft:
+                        img = img.resize((target_w, target_h), draft_resample(target_w / img.width))
+                    else:
+                        img = img.resize((target_w, target_h), Image.Resampling.LANCZOS)
+                photo = ImageTk.PhotoImage(img)
+            except Exception as e:
+                print("[Error] render image:", e)
+                return
+            if draft and img is not level:
+                self._pending_refine = (render_key, level, (target_w, target_h))
+                self._schedule_refine()
+            else:
+                self.render_cache[render_key] = photo
+        self.current_photo = photo
 
         # place image on canvas
         self.image_canvas.delete("all")
@@ -822,24 +4244,313 @@ class PhotoSorterApp:
         cy = max((ch - target_h) // 2, 0)
         self.image_canvas.coords(self.image_canvas_img_id, cx, cy)
 
-    def zoom_in(self):
-        # disable fit mode when user actively zooms
-        self.fit_mode = False
-        new_zoom = min(self.zoom_scale * self.zoom_step, self.zoom_max)
-        if abs(new_zoom - self.zoom_scale) < 1e-6:
+    # ------------------------------ Tiled render (zoom tinggi) ------------------------------
+    def _start_tiled_render(self, target_w, target_h, cw, ch):
+        """
+        Siapkan render tiled: scrollregion seukuran bitmap zoom penuh, tapi hanya tile
+        (RENDER_TILE_SIZE) yang memotong viewport (+1 tile margin) yang di-resample.
+        Memori sebanding ukuran layar, bukan ukuran gambar x zoom.
+        """
+        self.image_canvas.delete("all")
+        self.image_canvas_img_id = None
+        self.current_photo = None
+        self._tiles = {}
+        level, _level_scale = self._pyramid_for(self.current_path, self.current_pil).for_scale(
+            target_w / self.current_pil.width)
+        self._tiled = {
+            "path": self.current_path,
+            "base": self.current_pil,
+            "image": level,
+            "size": (target_w, target_h),
+            "offset": (max((cw - target_w) // 2, 0), max((ch - target_h) // 2, 0)),
+        }
+        self.image_canvas.config(scrollregion=(0, 0, max(target_w, cw), max(target_h, ch)))
+        self._update_visible_tiles()
+
+    def _schedule_tile_update(self):
+        if self._tiled is None or self._tile_update_pending:
             return
-        self.zoom_scale = new_zoom
-        self._render_current_image_fit()
-        self.update_status_bar()
+        self._tile_update_pending = True
+        self.root.after_idle(self._update_visible_tiles)
+
+    def _update_visible_tiles(self):
+        """Resample tile yang terlihat yang belum ada; buang tile yang sudah jauh dari viewport."""
+        self._tile_update_pending = False
+        state = self._tiled
+        if state is None or state["base"] is not self.current_pil:
+            return
+        src = state["image"]
+        tw, th = state["size"]
+        ox, oy = state["offset"]
+        sx = tw / src.width
+        T = RENDER_TILE_SIZE
+        try:
+            vx0 = self.image_canvas.canvasx(0) - ox
+            vy0 = self.image_canvas.canvasy(0) - oy
+            vw = max(self.image_canvas.winfo_width(), 1)
+            vh = max(self.image_canvas.winfo_height(), 1)
+        except Exception:
+            return
+        cols = -(-tw // T)
+        rows = -(-th // T)
+        c0 = max(0, int(vx0 // T) - 1)
+        c1 = min(cols - 1, int((vx0 + vw) // T) + 1)
+        r0 = max(0, int(vy0 // T) - 1)
+        r1 = min(rows - 1, int((vy0 + vh) // T) + 1)
+        wanted = {(c, r) for c in range(c0, c1 + 1) for r in range(r0, r1 + 1)}
+
+        for key in [k for k in self._tiles if k not in wanted]:
+            item_id, _photo, _final = self._tiles.pop(key)
+            self.image_canvas.delete(item_id)
+
+        new_tiles = sorted(wanted - set(self._tiles))
+        for (c, r) in new_tiles:
+            size, box = self._tile_geometry(c, r)
+            try:
+                # tile baru selalu draft dulu; LANCZOS menyusul saat input diam
+                tile = src.resize(size, draft_resample(sx), box=box)
+                photo = ImageTk.PhotoImage(tile)
+            except Exception as e:
+                print("[Error] render tile:", e)
+                continue
+            item_id = self.image_canvas.create_image(ox + c * T, oy + r * T, anchor="nw", image=photo)
+            self._tiles[(c, r)] = (item_id, photo, False)
+        if new_tiles:
+            self._cancel_refine()
+            self._schedule_refine()
+
+    def _tile_geometry(self, c, r):
+        """(ukuran tile di layar, box sumber di level pyramid) untuk tile (c, r) render tiled aktif."""
+        state = self._tiled
+        src = state["image"]
+        tw, th = state["size"]
+        sx, sy = tw / src.width, th / src.height
+        T = RENDER_TILE_SIZE
+        x0, y0 = c * T, r * T
+        x1, y1 = min(x0 + T, tw), min(y0 + T, th)
+        return (x1 - x0, y1 - y0), (x0 / sx, y0 / sy, x1 / sx, y1 / sy)
+
+    # ------------------------------ Refine (fase 2) ------------------------------
+    def _cancel_refine(self):
+        """Input baru: batalkan refine yang dijadwalkan / sedang jalan (hasilnya akan dibuang)."""
+        self._render_generation += 1
+        self._pending_refine = None
+        if self._refine_after_id is not None:
+            try:
+                self.root.after_cancel(self._refine_after_id)
+            except Exception:
+                pass
+            self._refine_after_id = None
+
+    def _schedule_refine(self):
+        if self._refine_after_id is not None:
+            self.root.after_cancel(self._refine_after_id)
+        generation = self._render_generation
+        self._refine_after_id = self.root.after(REFINE_IDLE_MS, lambda: self._start_refine(generation))
+
+    def _start_refine(self, generation):
+        self._refine_after_id = None
+        if generation != self._render_generation:
+            return
+        jobs = []
+        if self._tiled is not None:
+            src = self._tiled["image"]
+            for key, (_item_id, _photo, final) in self._tiles.items():
+                if not final:
+                    size, box = self._tile_geometry(*key)
+                    jobs.append(("tile", key, src, size, box))
+        elif self._pending_refine is not None:
+            render_key, level, size = self._pending_refine
+            jobs.append(("single", render_key, level, size, None))
+        if not jobs:
+            return
+        t = threading.Thread(target=self._refine_thread, args=(generation, jobs))
+        t.daemon = True
+        t.start()
+
+    def _refine_thread(self, generation, jobs):
+        """Resample LANCZOS di background; berhenti begitu ada input baru (generation berubah)."""
+        results = []
+        for kind, key, src, size, box in jobs:
+            if generation != self._render_generation:
+                return
+            try:
+                results.append((kind, key, src.resize(size, Image.Resampling.LANCZOS, box=box)))
+            except Exception:
+                traceback.print_exc()
+                return
+        self.root.after(0, lambda: self._apply_refine(generation, results))
+
+    def _apply_refine(self, generation, results):
+        if generation != self._render_generation:
+            return
+        for kind, key, img in results:
+            photo = ImageTk.PhotoImage(img)
+            if kind == "single":
+                self.render_cache[key] = photo
+                self.current_photo = photo
+                if self.image_canvas_img_id is not None:
+                    self.image_canvas.itemconfigure(self.image_canvas_img_id, image=photo)
+                self._pending_refine = None
+            else:
+                tile = self._tiles.get(key)
+                if tile is not None:
+                    self.image_canvas.itemconfigure(tile[0], image=photo)
+                    self._tiles[key] = (tile[0], photo, True)
+
+    def _on_image_scroll(self, bar, first, last):
+        bar.set(first, last)
+        self._schedule_tile_update()
+
+    def _scroll_extent(self):
+        """(lebar, tinggi) area scroll canvas gambar (scrollregion, bukan bbox item yang ada)."""
+        try:
+            region = [float(v) for v in str(self.image_canvas.cget("scrollregion")).split()]
+            if len(region) == 4:
+                return max(1, region[2]), max(1, region[3])
+        except Exception:
+            pass
+        bbox = self.image_canvas.bbox("all")
+        if bbox:
+            return max(1, bbox[2]), max(1, bbox[3])
+        return None
+
+    # ------------------------------ Pyramid ------------------------------
+    def _pyramid_for(self, path, im):
+        """ImagePyramid untuk im (dari cache jika base-nya sama, kalau tidak dibuat baru)."""
+        pyr = self.pyramid_cache.get(path)
+        if pyr is None or pyr.base is not im:
+            # level yang dibuat lazy oleh for_scale ikut dihitung ke budget tier pyramid
+            pyr = ImagePyramid(im, on_grow=lambda p: self.pyramid_cache.update_size(path, p))
+            self.pyramid_cache[path] = pyr
+        return pyr
+
+    def _prefetch_decode(self, path, target_size, should_cancel):
+        """Decode untuk prefetcher + bangun pyramid-nya di thread yang sama."""
+        im = self._open_path_to_pil(path, fast_preview=True, target_size=target_size, should_cancel=should_cancel)
+        pyr = ImagePyramid(im).build()
+        if should_cancel():
+            # user sudah pindah jauh: jangan isi tier pyramid dengan hasil yang akan dibuang
+            raise RawDecodeCancelled(path)
+        self.pyramid_cache[path] = pyr
+        return im
+
+    def _fit_decode_size(self):
+        """Ukuran viewport untuk decode tereduksi saat membuka gambar (mode fit); None jika canvas belum siap."""
+        try:
+            cw = self.image_canvas.winfo_width()
+            ch = self.image_canvas.winfo_height()
+        except Exception:
+            return None
+        if cw <= 1 or ch <= 1:
+            return None
+        return (cw, ch)
+
+    def _current_source_size(self):
+        """Ukuran piksel asli gambar aktif (bukan ukuran hasil decode tereduksi)."""
+        if not self.current_pil:
+            return None
+        return tuple(self.current_pil.info.get("source_size", self.current_pil.size))
+
+    def _ensure_full_resolution(self):
+        """
+        Jika yang tampil hasil decode tereduksi (mode fit), decode ulang gambar aktif di resolusi
+        penuh di background. Preview tereduksi tetap tampil sampai hasilnya siap, lalu dirender ulang.
+        """
+        if not self.current_pil or not self.current_path:
+            return
+        if self._current_source_size() == self.current_pil.size:
+            return
+        path = self.current_path
+        if path in self._full_res_pending:
+            return
+        self._full_res_pending.add(path)
+        t = threading.Thread(target=self._full_resolution_thread, args=(path,))
+        t.daemon = True
+        t.start()
+
+    def _full_resolution_thread(self, path):
+        """Decode resolusi penuh (demosaic RAW bisa lama); dibatalkan jika user sudah pindah gambar."""
+        try:
+            full = self._open_path_to_pil(path, fast_preview=True,
+                                          should_cancel=lambda: self.current_path != path)
+            error = None
+        except Exception as e:
+            full, error = None, e
+        self.root.after(0, lambda: self._on_full_resolution(path, full, error))
+
+    def _on_full_resolution(self, path, full, error):
+        self._full_res_pending.discard(path)
+        if full is None:
+            if path == self.current_path and not isinstance(error, RawDecodeCancelled):
+                self.status_label.config(text=f"[WARN] Gagal memuat resolusi penuh: {error}")
+            return
+        self.preview_cache[path] = full
+        if path != self.current_path or self.current_pil is None:
+            return
+        self.current_pil = full
+        if not self.in_gallery_mode:
+            self._render_current_image_fit()
+            self.update_status_bar()
+
+    def zoom_in(self):
+        self._request_zoom(self.zoom_step)
 
     def zoom_out(self):
-        self.fit_mode = False
-        new_zoom = max(self.zoom_scale / self.zoom_step, self.zoom_min)
-        if abs(new_zoom - self.zoom_scale) < 1e-6:
+        self._request_zoom(1.0 / self.zoom_step)
+
+    # ------------------------------ Input coalescing ------------------------------
+    def _schedule_frame(self):
+        if self._frame_after_id is None:
+            self._frame_after_id = self.root.after(INPUT_FRAME_MS, self._run_frame)
+
+    def _request_zoom(self, factor):
+        """Kumpulkan langkah zoom (key repeat / burst wheel); diterapkan sekali di frame berikutnya."""
+        if not self.current_pil:
+            return
+        self._pending_zoom *= factor
+        self._schedule_frame()
+
+    def _on_canvas_configure(self, event):
+        size = (event.width, event.height)
+        if size != self._canvas_size:
+            self._canvas_size = size
+            self._pending_resize = size
+            self._schedule_frame()
+
+    def _run_frame(self):
+        """Terapkan semua input yang terkumpul sejak frame lalu dengan paling banyak satu render."""
+        self._frame_after_id = None
+        zoom, self._pending_zoom = self._pending_zoom, 1.0
+        pan, self._pending_pan = self._pending_pan, None
+        resized, self._pending_resize = self._pending_resize, None
+        if not self.current_pil or self.in_gallery_mode:
             return
-        self.zoom_scale = new_zoom
-        self._render_current_image_fit()
-        self.update_status_bar()
+
+        render = False
+        if abs(zoom - 1.0) > 1e-6:
+            self._ensure_full_resolution()
+            # disable fit mode when user actively zooms
+            self.fit_mode = False
+            new_zoom = max(self.zoom_min, min(self.zoom_scale * zoom, self.zoom_max))
+            if abs(new_zoom - self.zoom_scale) > 1e-6:
+                self.zoom_scale = new_zoom
+                render = True
+        if resized and self.fit_mode:
+            # window membesar melebihi hasil decode tereduksi -> ambil resolusi penuh
+            iw, ih = self.current_pil.size
+            sw, sh = self._current_source_size()
+            if (sw, sh) != (iw, ih) and min(resized[0] / iw, resized[1] / ih) > 1.0:
+                self._ensure_full_resolution()
+            render = True
+
+        if render:
+            self._render_current_image_fit(draft=True)
+            self.update_status_bar()
+        elif resized:
+            self._schedule_tile_update()
+        if pan is not None:
+            self._apply_pan(*pan)
 
     def fit_to_window(self):
         """Set mode ke Fit-to-Window (gambar di-scale supaya memenuhi viewport)."""
@@ -855,6 +4566,7 @@ class PhotoSorterApp:
         """Tampilkan gambar pada 100% (actual pixels)."""
         if not self.current_pil:
             return
+        self._ensure_full_resolution()
         self.fit_mode = False
         self.zoom_scale = 1.0
         self._render_current_image_fit()
@@ -884,29 +4596,39 @@ class PhotoSorterApp:
         self._pan_start = (event.x, event.y, self.image_canvas.canvasx(0), self.image_canvas.canvasy(0))
 
     def _do_pan(self, event):
+        if not self._pan_start:
+            return
+        self._pending_pan = (event.x, event.y)
+        self._schedule_frame()
+
+    def _apply_pan(self, x, y):
         if not self._pan_start:
             return
         sx, sy, scx, scy = self._pan_start
-        dx = sx - event.x
-        dy = sy - event.y
+        dx = sx - x
+        dy = sy - y
         try:
-            bbox = self.image_canvas.bbox("all")
-            if bbox:
-                total_w = max(1, bbox[2])
-                total_h = max(1, bbox[3])
+            extent = self._scroll_extent()
+            if extent:
+                total_w, total_h = extent
                 self.image_canvas.xview_moveto((scx + dx) / total_w)
                 self.image_canvas.yview_moveto((scy + dy) / total_h)
+                self._schedule_tile_update()
             else:
                 self.image_canvas.scan_mark(sx, sy)
-                self.image_canvas.scan_dragto(event.x, event.y, gain=1)
+                self.image_canvas.scan_dragto(x, y, gain=1)
         except Exception:
             try:
                 self.image_canvas.scan_mark(sx, sy)
-                self.image_canvas.scan_dragto(event.x, event.y, gain=1)
+                self.image_canvas.scan_dragto(x, y, gain=1)
             except Exception:
                 pass
 
     def display_current_image(self):
+        # tile lama ikut terhapus oleh canvas.delete("all") di bawah
+        self._tiled = None
+        self._tiles = {}
+        self._cancel_refine()
         if not (0 <= self.current_index < len(self.image_list)):
             self.image_canvas.delete("all")
             self.image_canvas.create_text(10, 10, text="✅ Semua foto telah dipilah!\nPilih folder sumber baru atau tutup aplikasi.", anchor="nw", fill=FG)
@@ -919,8 +4641,13 @@ class PhotoSorterApp:
             return
 
         image_name = self.image_list[self.current_index]
-        image_path = os.path.normpath(os.path.join(self.source_dir, image_name))
-        ext = os.path.splitext(image_path)[1].lower()
+        image_path = self.image_list.path_at(self.current_index)
+        ext = self.image_list.kind_at(self.current_index)
+        if self._last_display_index is not None and abs(self.current_index - self._last_display_index) > 1:
+            # lompat (gallery / setelah reload) -> kecepatan navigasi lama tidak relevan
+            self._nav_history = []
+        self._last_display_index = self.current_index
+        self._schedule_prefetch()
 
         # If preview cached, use it immediately
         if image_path in self.preview_cache:
@@ -939,11 +4666,21 @@ class PhotoSorterApp:
             except Exception:
                 pass
 
+        # Sedang di-decode oleh prefetcher -> tunggu hasilnya (_on_prefetch_done)
+        if self.prefetcher.is_inflight(image_path):
+            self.image_canvas.delete("all")
+            self.image_canvas.create_text(10, 10, text=f"⏳ Memuat: {image_name}", anchor="nw", fill=FG)
+            self.update_buttons_state()
+            self.update_status_bar()
+            return
+
         # If ARW and rawpy available -> load in background
         if ext == ".arw" and RAWPY_AVAILABLE:
             # cancel any previous load
             with self._load_lock:
                 self._load_cancel = True
+                self._load_generation += 1
+                generation = self._load_generation
             # small delay to allow currently running thread to stop (it checks flag)
             def start_thread():
                 with self._load_lock:
@@ -952,7 +4689,8 @@ class PhotoSorterApp:
                 # show placeholder
                 self.image_canvas.delete("all")
                 self.image_canvas.create_text(10, 10, text=f"⏳ Memuat preview .arw: {image_name}", anchor="nw", fill=FG)
-                t = threading.Thread(target=self._load_arw_preview_thread, args=(image_path,))
+                t = threading.Thread(target=self._load_arw_preview_thread,
+                                     args=(image_path, self._fit_decode_size(), generation))
                 t.daemon = True
                 t.start()
             self.root.after(10, start_thread)
@@ -960,10 +4698,12 @@ class PhotoSorterApp:
 
         # Non-ARW or rawpy not available -> load synchronously (existing logic)
         try:
-            self.current_pil = self._open_path_to_pil(image_path, fast_preview=True)
+            self.current_pil = self._open_path_to_pil(image_path, fast_preview=True,
+                                                      target_size=self._fit_decode_size())
             self.current_path = image_path
         except Exception as e:
             print(f"[Skip] Gagal buka {image_path}: {e}")
+            self._mark_decode_failed(image_path, e)
             try:
                 self.status_label.config(text=f"[WARN] Skip file: {os.path.basename(image_path)} ({e})")
             except Exception:
@@ -994,14 +4734,87 @@ class PhotoSorterApp:
         self.update_buttons_state()
         self.update_status_bar()
 
+    def _path_at(self, index):
+        return self.image_list.path_at(index)
+
+    def _pin_cache_window(self):
+        """Pin entri cache untuk gambar di sekitar current_index (dan jendela prefetch) supaya tidak di-evict."""
+        lo = max(0, self.current_index - CACHE_PIN_RADIUS)
+        hi = min(len(self.image_list), self.current_index + CACHE_PIN_RADIUS + 1)
+        pinned = [self.image_list.path_at(i) for i in range(lo, hi)]
+        for cache in (self.full_cache, self.thumb_cache, self.gallery_cache):
+            cache.set_pinned(pinned)
+        self.preview_cache.set_pinned(set(pinned) | set(self._prefetch_window))
+        self.pyramid_cache.set_pinned(set(pinned) | set(self._prefetch_window))
+
+    def _note_navigation(self, delta):
+        """Catat langkah navigasi (+1/-1) untuk menentukan arah & kecepatan prefetch."""
+        now = time.monotonic()
+        self._nav_history = [(t, d) for (t, d) in self._nav_history if now - t <= PREFETCH_SPEED_WINDOW]
+        self._nav_history.append((now, delta))
+
+    def _prefetch_extent(self):
+        """Return (ahead, behind, direction) dari riwayat navigasi terbaru."""
+        now = time.monotonic()
+        recent = [d for (t, d) in self._nav_history if now - t <= PREFETCH_SPEED_WINDOW]
+        direction = -1 if recent and recent[-1] < 0 else 1
+        speed = len(recent) / PREFETCH_SPEED_WINDOW      # langkah per detik
+        ahead = min(PREFETCH_AHEAD_MAX, PREFETCH_AHEAD_MIN + int(speed))
+        behind = 1 if speed >= 2 else PREFETCH_BEHIND
+        return ahead, behind, direction
+
+    def _schedule_prefetch(self):
+        if not self.image_list:
+            self.prefetcher.cancel()
+            self._prefetch_window = ()
+            return
+        ahead, behind, direction = self._prefetch_extent()
+        order = []
+        # urut prioritas: selang-seling depan/belakang, depan lebih dulu dan lebih banyak
+        for step in range(1, max(ahead, behind) + 1):
+            if step <= ahead:
+                order.append(self.current_index + direction * step)
+            if step <= behind:
+                order.append(self.current_index - direction * step)
+        paths = [self.image_list.path_at(i) for i in order if 0 <= i < len(self.image_list)]
+        self._prefetch_window = tuple(paths)
+        self._pin_cache_window()
+        self.prefetcher.schedule(paths, target_size=self._fit_decode_size(),
+                                 keep=(self._path_at(self.current_index),))
+
+    def _on_prefetch_done(self, path, ok):
+        """Dipanggil di main thread setelah prefetcher selesai; tampilkan jika user sedang menunggu gambar ini."""
+        if self.in_gallery_mode or not (0 <= self.current_index < len(self.image_list)):
+            return
+        current = self.image_list.path_at(self.current_index)
+        if current == path and self.current_path != path:
+            self.display_current_image()
+
     def _fill_file_details(self, image_path):
         try:
             fname = os.path.basename(image_path)
-            fsize = os.path.getsize(image_path)
+            cached = self.image_list.stat_of(os.path.relpath(image_path, self.source_dir))
+            if cached is None:
+                st = os.stat(image_path)
+                cached = (st.st_size, st.st_mtime, st.st_ctime)
+            fsize, mtime, created_ts = cached
             fext = os.path.splitext(fname)[1].lower().lstrip('.') or '—'
-            res_text = f"{self.current_pil.width} x {self.current_pil.height}"
-            created_ts = os.path.getctime(image_path)
+            meta = self.catalog.get(os.path.normpath(image_path), fsize, mtime) if self.catalog else None
+            if meta and meta["width"] and meta["height"]:
+                # dimensi asli dari header (bukan ukuran preview half-size), sesuai orientasi
+                sw, sh = meta["width"], meta["height"]
+                if (meta["orientation"] or 1) >= 5:
+                    sw, sh = sh, sw
+                res_text = f"{sw} x {sh}"
+            else:
+                sw, sh = self._current_source_size()
+                res_text = f"{sw} x {sh}"
+            if meta and meta["decode_failed"]:
+                res_text += " (gagal di-decode)"
             created_text = human_readable_datetime(created_ts)
+            self.file_taken_label.config(text=f"Diambil: {(meta or {}).get('capture_time') or '—'}")
+            self.file_camera_label.config(text=f"Kamera: {(meta or {}).get('camera') or '—'}")
+            self.file_lens_label.config(text=f"Lensa: {(meta or {}).get('lens') or '—'}")
 
             self.file_name_label.config(text=f"Nama: {fname}")
             self.file_size_label.config(text=f"Ukuran: {human_readable_size(fsize)}")
@@ -1012,30 +4825,26 @@ class PhotoSorterApp:
         except Exception:
             self._clear_file_details()
 
-    def _load_arw_preview_thread(self, image_path):
+    def _load_arw_preview_thread(self, image_path, target_size=None, generation=None):
         """
-        Load .arw preview in background (half_size). Set preview_cache and update UI when done.
-        Thread checks self._load_cancel to abort if another load started.
+        Load .arw preview in background (embedded JPEG, fallback half_size). Set preview_cache and update UI when done.
+        Thread checks self._load_cancel to abort if another load started; a RAW demosaic
+        running in the process pool is killed as soon as a newer load takes over.
         """
+        def superseded():
+            return generation is not None and generation != self._load_generation
         try:
-            # attempt to open with half_size
-            im = None
             try:
-                with rawpy.imread(image_path) as raw:
-                    rgb = raw.postprocess(
-                        use_camera_wb=True,
-                        no_auto_bright=True,
-                        output_bps=8,
-                        half_size=True,   # fast preview
-                        gamma=(2.2, 4.5)
-                    )
-                im = Image.fromarray(rgb)
+                im = self._open_path_to_pil(image_path, fast_preview=True, target_size=target_size,
+                                            should_cancel=superseded)
+            except RawDecodeCancelled:
+                return
             except Exception as e:
                 raise RuntimeError(f"Gagal memproses .arw untuk preview: {e}")
 
             # check if cancelled
             with self._load_lock:
-                if self._load_cancel:
+                if self._load_cancel or superseded():
                     return
 
             # store preview cache and update UI
@@ -1045,7 +4854,7 @@ class PhotoSorterApp:
                 # ensure current index still refers to this image
                 if not (0 <= self.current_index < len(self.image_list)):
                     return
-                if os.path.normpath(os.path.join(self.source_dir, self.image_list[self.current_index])) != os.path.normpath(image_path):
+                if self.image_list.path_at(self.current_index) != os.path.normpath(image_path):
                     # user moved to another image
                     return
                 try:
@@ -1065,59 +4874,352 @@ class PhotoSorterApp:
         except Exception as e:
             # show error to user but don't block
             msg = str(e)
+            self._mark_decode_failed(image_path, e)
             def _err():
                 self.status_label.config(text=f"[ERR] {msg}")
             self.root.after(0, _err)
 
     # ------------------------------ File Actions ------------------------------
     def process_file(self, dest_path):
+        """Catat keputusan (antre move/copy di background) lalu langsung lanjut ke gambar berikutnya."""
         if not (0 <= self.current_index < len(self.image_list)):
             return
 
         src_name = self.image_list[self.current_index]
-        src_path = os.path.normpath(os.path.join(self.source_dir, src_name))
+        src_path = self.image_list.path_at(self.current_index)
         dest_path = os.path.normpath(dest_path)
 
-        try:
-            target_path = self.make_unique_path(dest_path, src_name)
+        if self.current_path and os.path.normpath(self.current_path) == src_path:
+            self.current_pil = None
+            self.current_photo = None
+            self.current_path = None
+        self._drop_caches_for(src_path)
+
+        removed_index = self.current_index
+        self.image_list.pop(removed_index)
+        if self.current_index >= len(self.image_list) and self.image_list:
+            self.current_index -= 1
+
+        if self.deferred_mode.get() and self.journal is not None:
+            self.journal.decide([(src_path, src_name)], dest_path, bool(self.copy_mode.get()))
+            self._update_commit_button()
+        else:
+            self.transfers.submit(src_path, src_name, dest_path, bool(self.copy_mode.get()))
+        self._after_item_removed(removed_index)
+
+    def process_selection(self, dest_path):
+        """Kirim semua item terpilih di gallery ke dest_path sebagai satu batch transfer paralel."""
+        indices = sorted(i for i in self.gallery.selected if 0 <= i < len(self.image_list))
+        if not indices:
+            return
+        dest_path = os.path.normpath(dest_path)
+        names = [self.image_list[i] for i in indices]
+        paths = [self.image_list.path_at(i) for i in indices]
+
+        if self.current_path and os.path.normpath(self.current_path) in paths:
+            self.current_pil = None
+            self.current_photo = None
+            self.current_path = None
+        self._drop_caches_for(*paths)
 
-            if self.copy_mode.get():
-                # if ARW and preview exists but you want convert to JPG automatically, keep original extension
-                shutil.copy2(src_path, target_path)
+        # index aktif baru: item pertama yang tersisa di/atau sesudah posisi lama
+        for i in reversed(indices):
+            self.image_list.pop(i)
+        self.current_index = min(self.current_index - bisect.bisect_left(indices, self.current_index),
+                                 max(0, len(self.image_list) - 1))
+
+        if self.deferred_mode.get() and self.journal is not None:
+            self.journal.decide(list(zip(paths, names)), dest_path, bool(self.copy_mode.get()))
+            self._update_commit_button()
+        else:
+            self.transfers.submit_batch(list(zip(paths, names)), dest_path, bool(self.copy_mode.get()))
+
+        if not self.image_list:
+            self.close_gallery_mode()
+            self.display_current_image()
+        else:
+            self.gallery.remove_indices(indices)
+            self.gallery.set_highlight(self.current_index)
+            self.update_buttons_state()
+        mode = "Salin" if self.copy_mode.get() else "Pindah"
+        when = "dicatat, menunggu Commit" if self.deferred_mode.get() else "berjalan di background"
+        self.status_label.config(text=f"[BATCH] {mode} {len(names)} file → '{os.path.basename(dest_path) or dest_path}' ({when})")
+
+    # ------------------------------ Mode Tunda (journal) ------------------------------
+    def _open_journal(self):
+        """Buka journal folder sumber; tawarkan commit jika ada keputusan yang tertinggal (mis. setelah crash)."""
+        self.journal = DecisionJournal(DecisionJournal.path_for(self.source_dir))
+        self._update_commit_button()
+        if not len(self.journal):
+            return
+        answer = messagebox.askyesnocancel(
+            "Keputusan belum di-commit",
+            f"Ada {len(self.journal)} keputusan Mode Tunda yang belum di-commit untuk folder ini.\n\n"
+            "Ya = commit sekarang\nTidak = simpan (commit nanti)\nBatal = buang keputusan")
+        if answer is None:
+            self.journal.drop([e["id"] for e in self.journal.pending()])
+            self._update_commit_button()
+        elif answer:
+            self.root.after_idle(self.commit_decisions)
+
+    def _update_commit_button(self):
+        count = len(self.journal) if self.journal is not None else 0
+        try:
+            if CTK_AVAILABLE:
+                self.commit_button.configure(text=f"✅ Commit ({count})")
             else:
-                shutil.move(src_path, target_path)
+                self.commit_button.config(text=f"✅ Commit ({count})")
+        except Exception:
+            pass
 
-            if self.current_path and os.path.normpath(self.current_path) == src_path:
-                self.current_pil = None
-                self.current_photo = None
-                self.current_path = None
+    def commit_decisions(self):
+        """
+        Jalankan semua keputusan tertunda sebagai satu batch per folder tujuan. Cek disk,
+        pembuatan folder dan pemilihan nama unik dikerjakan worker transfer, bukan thread Tk;
+        TransferQueue menjalankan batch ke device tujuan yang sama berurutan, disk berbeda paralel.
+        Idempoten: keputusan yang targetnya sudah berisi salinan lengkap hanya menghapus sumber
+        yang tersisa tanpa menyalin ulang, jadi commit yang terputus cukup diulang.
+        """
+        if self.journal is None or not len(self.journal):
+            self.status_label.config(text="[COMMIT] Tidak ada keputusan tertunda.")
+            return
+        queued = {job.journal_id for job in self.transfers.jobs() if job.status in ("pending", "running")}
+        groups = OrderedDict()
+        for e in self.journal.pending():
+            if e["id"] not in queued:
+                groups.setdefault((e["dest"], e["copy"]), []).append(e)
+        if not groups:
+            self.status_label.config(text="[COMMIT] Semua keputusan sudah ada di antrean transfer.")
+            return
+        for (dest, copy), group in groups.items():
+            self.transfers.submit_batch([(e["src"], e["name"]) for e in group], dest, copy,
+                                        targets=[e["target"] for e in group], journal_ids=[e["id"] for e in group])
+        self._update_commit_button()
+        self.status_label.config(
+            text=f"[COMMIT] {sum(len(g) for g in groups.values())} file diantrekan ({len(groups)} folder tujuan).")
+
+    def _record_journal_target(self, job):
+        """Thread worker transfer: catat path tujuan (fsync) sebelum data ditulis, supaya resume tidak menduplikasi."""
+        journal = self.journal
+        if job.journal_id is not None and journal is not None:
+            journal.set_targets([(job.journal_id, job.target)])
+
+    def _drop_caches_for(self, *src_paths):
+        """Buang semua cache untuk file yang dipindah/disalin/dihapus (satu kali lewat per cache)."""
+        paths = set(src_paths)
+        if len(paths) == 1:
+            (src_path,) = paths
+            for cache in (self.preview_cache, self.thumb_cache, self.gallery_cache, self.full_cache, self.pyramid_cache):
+                cache.pop(src_path, None)
+        else:
+            for cache in (self.preview_cache, self.thumb_cache, self.gallery_cache, self.full_cache, self.pyramid_cache):
+                cache.remove_if(lambda key: key in paths)
+        self.render_cache.remove_if(lambda key: key[0] in paths)
 
-            # clear caches for moved/copied file
-            if src_path in self.preview_cache:
-                del self.preview_cache[src_path]
-            if src_path in self.thumb_cache:
-                del self.thumb_cache[src_path]
-            if src_path in self.gallery_cache:
-                del self.gallery_cache[src_path]
-            if src_path in self.full_cache:
-                del self.full_cache[src_path]
-
-            self.image_list.pop(self.current_index)
-            if self.current_index >= len(self.image_list) and self.image_list:
-                self.current_index -= 1
+    def _reinsert_file(self, name, st=None):
+        """Kembalikan file ke image_list (transfer gagal/dibatalkan) tanpa menggeser gambar aktif."""
+        if name in self.image_list:
+            return
+        if st is None:
+            try:
+                st = os.stat(os.path.join(self.source_dir, name))
+            except OSError:
+                return
+        index = self._insert_position(name)
+        self.image_list.insert(index, name, st)
+        if len(self.image_list) == 1:
+            self.current_index = 0
+            if not self.in_gallery_mode:
+                self.display_current_image()
+        elif index <= self.current_index:
+            self.current_index += 1
+        if self.in_gallery_mode and self.gallery:
+            self.gallery.insert_index(index)
+            self.gallery.set_highlight(self.current_index)
+        self.update_buttons_state()
+        self.update_prev_next_thumbs()
 
-            self.refresh_gallery_if_open()
+    # ------------------------------ Transfer queue UI ------------------------------
+    def _on_transfer_update(self, job):
+        """Main thread: laporkan progress/error transfer di status bar dan jendela antrean."""
+        name = os.path.basename(job.name)
+        dest = os.path.basename(job.dest_dir) or job.dest_dir
+        if job.status == "failed":
+            self.status_label.config(text=f"[ERR] Gagal {'menyalin' if job.copy else 'memindah'} {name} ke '{dest}': {job.error}")
+            # keputusan journal tetap tertunda -> dicoba lagi di Commit berikutnya
+            if job.journal_id is None:
+                self._reinsert_file(job.name)
+            elif self.journal is not None and not os.path.lexists(job.src):
+                # sumber hilang (dihapus di luar aplikasi) -> keputusan tidak bisa dijalankan lagi
+                self.journal.drop([job.journal_id])
+                self._update_commit_button()
+        elif job.status == "cancelled":
+            self.status_label.config(text=f"[TRANSFER] Dibatalkan: {name}")
+            if job.journal_id is not None and self.journal is not None:
+                self.journal.drop([job.journal_id])
+                self._update_commit_button()
+            self._reinsert_file(job.name)
+        elif job.status == "running":
+            retry = f" (percobaan {job.attempts})" if job.attempts > 1 else ""
+            self.status_label.config(
+                text=f"[TRANSFER] {name} → '{dest}' {int(job.progress * 100)}%{retry} | {self.transfers.pending_count()} dalam antrean")
+        if job.status == "done" and job.journal_id is not None and self.journal is not None:
+            self.journal.mark_done([job.journal_id])
+            self._update_commit_button()
+        if job.status == "done" and self.transfers.pending_count() == 0:
+            self.status_label.config(text=f"[TRANSFER] Semua transfer selesai. Terakhir: {name} → '{dest}' ({job.method})")
+        self._refresh_transfer_window()
+
+    # ------------------------------ Pencarian katalog ------------------------------
+    def open_catalog_search(self):
+        """Cari file di folder sumber lewat MetadataCatalog.find (kamera, lensa, rentang tanggal ambil)."""
+        if self.catalog is None:
+            messagebox.showinfo("Info", "Katalog metadata tidak tersedia (sqlite3 tidak ada / cache tidak bisa ditulis).")
+            return
+        if not self.source_dir or not self.image_list:
+            messagebox.showinfo("Info", "Pilih folder sumber yang berisi foto terlebih dahulu.")
+            return
+
+        win = tk.Toplevel(self.root)
+        win.title("Cari di Katalog")
+        win.geometry("720x420")
+        win.transient(self.root)
+        try:
+            win.configure(bg=DARK_BG)
+        except Exception:
+            pass
+
+        form = tk.Frame(win, bg=DARK_BG)
+        form.pack(side="top", fill="x", padx=8, pady=(8, 4))
+        fields = {}
+        for col, (key, label) in enumerate((("camera", "Kamera"), ("lens", "Lensa"),
+                                            ("taken_from", "Dari (YYYY-MM-DD)"), ("taken_to", "Sampai (YYYY-MM-DD)"))):
+            form.grid_columnconfigure(col, weight=1)
+            tk.Label(form, text=label, bg=DARK_BG, fg=FG, anchor="w").grid(row=0, column=col, sticky="w", padx=(0, 6))
+            entry = tk.Entry(form, bg=BTN_BG, fg=FG, insertbackground=FG)
+            entry.grid(row=1, column=col, sticky="ew", padx=(0, 6))
+            fields[key] = entry
+
+        lb = tk.Listbox(win, bg=BTN_BG, fg=FG, font=("TkFixedFont", 10))
+        lb.pack(side="top", fill="both", expand=True, padx=8, pady=4)
+        info = tk.Label(win, text="Isi filter lalu tekan Enter / Cari (kosong = semua file yang sudah tercatat).",
+                        bg=DARK_BG, fg=MUTED, anchor="w")
+        info.pack(fill="x", padx=8)
+        win.names = []
+
+        def search(_event=None):
+            query = {key: entry.get().strip() or None for key, entry in fields.items()}
+            if query["taken_to"] and len(query["taken_to"]) == 10:
+                query["taken_to"] += " 23:59:59"   # tanggal saja -> sampai akhir hari itu
+            try:
+                paths = self.catalog.find(under=self.source_dir, **query)
+            except sqlite3.Error as e:
+                messagebox.showerror("Error", f"Query katalog gagal: {e}", parent=win)
+                return
+            # hanya file yang masih ada di daftar sumber (bukan yang sudah dipindah / subfolder di luar mode)
+            names = [name for name in (os.path.relpath(p, self.source_dir) for p in paths) if name in self.image_list]
+            lb.delete(0, "end")
+            for name in names:
+                lb.insert("end", name)
+            win.names = names
+            info.config(text=f"{len(names)} file cocok. Klik dua kali untuk membuka.")
+
+        def open_selected(_event=None):
+            sel = lb.curselection()
+            if not sel or sel[0] >= len(win.names):
+                return
+            try:
+                index = self.image_list.index(win.names[sel[0]])
+            except ValueError:
+                messagebox.showinfo("Info", "File sudah tidak ada di daftar sumber.", parent=win)
+                return
+            self.current_index = index
+            if self.in_gallery_mode:
+                self.close_gallery_mode()
             self.display_current_image()
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Gagal memproses file:\n{e}")
+        for entry in fields.values():
+            entry.bind("<Return>", search)
+        lb.bind("<Double-Button-1>", open_selected)
+
+        bottom = tk.Frame(win, bg=DARK_BG)
+        bottom.pack(fill="x", padx=8, pady=(4, 8))
+        tk.Button(bottom, text="Cari", command=search, bg=BTN_BG, fg=FG, activebackground=BTN_ACTIVE, activeforeground=FG).pack(side="left")
+        tk.Button(bottom, text="Buka yang dipilih", command=open_selected, bg=BTN_BG, fg=FG, activebackground=BTN_ACTIVE, activeforeground=FG).pack(side="left", padx=(6, 0))
+        tk.Button(bottom, text="Tutup", command=win.destroy, bg=BTN_BG, fg=FG, activebackground=BTN_ACTIVE, activeforeground=FG).pack(side="right")
+        fields["camera"].focus_set()
+
+    def open_transfer_window(self):
+        if self._transfer_window is not None:
+            try:
+                self._transfer_window.lift()
+                return
+            except Exception:
+                self._transfer_window = None
+
+        win = tk.Toplevel(self.root)
+        win.title("Antrean Transfer")
+        win.geometry("720x360")
+        win.transient(self.root)
+        try:
+            win.configure(bg=DARK_BG)
+        except Exception:
+            pass
+
+        lb = tk.Listbox(win, selectmode="extended", bg=BTN_BG, fg=FG, font=("TkFixedFont", 10))
+        lb.pack(side="top", fill="both", expand=True, padx=8, pady=(8, 4))
+
+        def cancel_selected():
+            ids = [win.job_ids[i] for i in lb.curselection() if i < len(win.job_ids)]
+            cancelled = [job_id for job_id in ids if self.transfers.cancel(job_id) is not None]
+            if ids and not cancelled:
+                messagebox.showinfo("Info", "Transfer yang dipilih sudah selesai.", parent=win)
+
+        def on_close():
+            self._transfer_window = None
+            win.destroy()
+
+        bottom = tk.Frame(win, bg=DARK_BG)
+        bottom.pack(fill="x", padx=8, pady=(0, 8))
+        tk.Button(bottom, text="Batalkan yang dipilih", command=cancel_selected, bg=BTN_BG, fg=FG, activebackground=BTN_ACTIVE, activeforeground=FG).pack(side="left")
+        tk.Button(bottom, text="Tutup", command=on_close, bg=BTN_BG, fg=FG, activebackground=BTN_ACTIVE, activeforeground=FG).pack(side="right")
+        win.protocol("WM_DELETE_WINDOW", on_close)
+
+        win.listbox = lb
+        win.job_ids = []
+        self._transfer_window = win
+        self._refresh_transfer_window()
+
+    def _refresh_transfer_window(self):
+        win = self._transfer_window
+        if win is None:
+            return
+        labels = {"pending": "ANTRE", "running": "JALAN", "done": "SELESAI", "failed": "GAGAL", "cancelled": "BATAL"}
+        try:
+            lb = win.listbox
+            selected = {win.job_ids[i] for i in lb.curselection() if i < len(win.job_ids)}
+            jobs = self.transfers.jobs()
+            lb.delete(0, "end")
+            win.job_ids = []
+            for job in jobs:
+                mode = "COPY" if job.copy else "MOVE"
+                if job.method:
+                    mode += f"/{job.method}"
+                pct = f"{int(job.progress * 100):3d}%"
+                err = f"  ({job.error})" if job.status == "failed" and job.error else ""
+                lb.insert("end", f"{labels.get(job.status, job.status):8} {pct} {mode:22} {os.path.basename(job.name)} → {job.dest_dir}{err}")
+                win.job_ids.append(job.job_id)
+                if job.job_id in selected:
+                    lb.selection_set("end")
+        except tk.TclError:
+            self._transfer_window = None
 
     def delete_current_file(self):
         if not (0 <= self.current_index < len(self.image_list)):
             return
 
         src_name = self.image_list[self.current_index]
-        src_path = os.path.normpath(os.path.join(self.source_dir, src_name))
+        src_path = self.image_list.path_at(self.current_index)
 
         if send2trash is None:
             resp = messagebox.askyesno(
@@ -1160,13 +5262,11 @@ class PhotoSorterApp:
             self.current_pil = None
             self.current_photo = None
             self.current_path = None
-        if src_path in self.thumb_cache:
-            del self.thumb_cache[src_path]
-        if src_path in self.gallery_cache:
-            del self.gallery_cache[src_path]
+        self._drop_caches_for(src_path)
 
+        removed_index = self.current_index
         try:
-            self.image_list.pop(self.current_index)
+            self.image_list.pop(removed_index)
         except Exception:
             pass
 
@@ -1174,25 +5274,26 @@ class PhotoSorterApp:
             self.current_index -= 1
 
         self.status_label.config(text=f"[INFO] File dihapus: {src_name}")
-        self.refresh_gallery_if_open()
-        self.display_current_image()
+        self._after_item_removed(removed_index)
 
-    def make_unique_path(self, dest_dir, filename):
-        base, ext = os.path.splitext(filename)
+    def make_unique_path(self, dest_dir, filename, reserved=()):
+        """
+        filename boleh path relatif (mode subfolder) -> hanya basename yang dipakai di tujuan.
+        reserved: path yang sudah diklaim transfer lain yang masih berjalan (dianggap sudah ada).
+        Nama dipilih dari DestinationNameIndex; os.path.exists hanya sebagai penjaga terakhir
+        jika folder tujuan diubah program lain sejak index dibangun.
+        """
+        filename = os.path.basename(filename)
         dest_dir = os.path.abspath(dest_dir)
         if not os.path.exists(dest_dir):
             try:
                 os.makedirs(dest_dir, exist_ok=True)
             except Exception:
                 pass
-        candidate = os.path.join(dest_dir, filename)
-        if os.path.exists(candidate):
-            n = 2
-            while True:
-                candidate = os.path.join(dest_dir, f"{base} ({n}){ext}")
-                if not os.path.exists(candidate):
-                    break
-                n += 1
+        candidate = self.dest_names.claim(dest_dir, filename, reserved)
+        while os.path.exists(candidate):
+            self.dest_names.note(dest_dir, os.path.basename(candidate))
+            candidate = self.dest_names.claim(dest_dir, filename, reserved)
         return candidate
 
     # ------------------------------ Export Full Quality (.arw -> jpg/png) ------------------------------
@@ -1248,6 +5349,32 @@ class PhotoSorterApp:
         t.daemon = True
         t.start()
 
+    def on_close(self):
+        pending = self.transfers.pending_count()
+        if pending and not messagebox.askyesno(
+                "Transfer belum selesai",
+                f"Masih ada {pending} transfer yang berjalan/tertunda.\n"
+                "Keluar sekarang? (transfer yang belum selesai akan dibatalkan)"):
+            return
+        # cegah on_close ganda selama menunggu transfer berhenti
+        self.root.protocol("WM_DELETE_WINDOW", lambda: None)
+        if pending:
+            self.status_label.config(text="[TRANSFER] Membatalkan transfer...")
+            self.transfers.shutdown(poll=self.root.update)
+        if self.source_watcher is not None:
+            self.source_watcher.stop()
+        if self.raw_pool is not None:
+            self.raw_pool.shutdown()
+        if self.catalog is not None:
+            # hentikan pass katalog / sort yang masih berjalan sebelum koneksi ditutup
+            self._catalog_generation += 1
+            self._sort_generation += 1
+            try:
+                self.catalog.close()
+            except sqlite3.Error:
+                pass
+        self.root.destroy()
+
     # ------------------------------ Navigation & Status ------------------------------
     def go_next(self):
         if self.in_gallery_mode:
@@ -1258,6 +5385,7 @@ class PhotoSorterApp:
             return
         if self.current_index < len(self.image_list) - 1:
             self.current_index += 1
+            self._note_navigation(1)
             self.display_current_image()
 
     def go_back(self):
@@ -1269,23 +5397,29 @@ class PhotoSorterApp:
             return
         if self.current_index > 0:
             self.current_index -= 1
+            self._note_navigation(-1)
             self.display_current_image()
 
     def jump_prev(self):
         if self.current_index > 0:
             self.current_index -= 1
+            self._note_navigation(-1)
             self.display_current_image()
 
     def jump_next(self):
         if self.current_index < len(self.image_list) - 1:
             self.current_index += 1
+            self._note_navigation(1)
             self.display_current_image()
 
     def update_prev_next_thumbs(self):
+        missing = []
         prev_index = self.current_index - 1
         if 0 <= prev_index < len(self.image_list):
-            prev_path = os.path.normpath(os.path.join(self.source_dir, self.image_list[prev_index]))
+            prev_path = self.image_list.path_at(prev_index)
             ph = self._make_small_thumb(prev_path)
+            if not ph:
+                missing.append(os.path.normpath(prev_path))
             if ph:
                 self.prev_thumb_label.config(image=ph, text="")
                 self.prev_thumb_label.image = ph
@@ -1298,8 +5432,10 @@ class PhotoSorterApp:
 
         next_index = self.current_index + 1
         if next_index < len(self.image_list):
-            next_path = os.path.normpath(os.path.join(self.source_dir, self.image_list[next_index]))
+            next_path = self.image_list.path_at(next_index)
             ph = self._make_small_thumb(next_path)
+            if not ph:
+                missing.append(os.path.normpath(next_path))
             if ph:
                 self.next_thumb_label.config(image=ph, text="")
                 self.next_thumb_label.image = ph
@@ -1309,6 +5445,7 @@ class PhotoSorterApp:
         else:
             self.next_thumb_label.config(image='', text="— Next —", fg=MUTED, bg=DARK_BG)
             self.next_thumb_label.image = None
+        self.small_thumb_loader.schedule(missing)
 
     def update_buttons_state(self):
         has_photos = bool(self.image_list)
@@ -1329,12 +5466,14 @@ class PhotoSorterApp:
 
     def update_status_bar(self):
         mode = "COPY" if self.copy_mode.get() else "MOVE"
+        if self.deferred_mode.get():
+            mode += " · TUNDA"
         zoom_pct = ""
         if self.current_pil:
             try:
                 cw = max(self.image_canvas.winfo_width(), 1)
                 ch = max(self.image_canvas.winfo_height(), 1)
-                iw, ih = self.current_pil.width, self.current_pil.height
+                iw, ih = self._current_source_size()
                 if self.fit_mode:
                     fit_scale = min(cw / iw, ch / ih)
                     zoom_pct = f" | Zoom: {int(fit_scale*100)}% (Fit)"
@@ -1343,18 +5482,29 @@ class PhotoSorterApp:
             except Exception:
                 zoom_pct = f" | Zoom: {int(self.zoom_scale*100)}%"
 
+        pending = self.transfers.pending_count()
+        transfer_text = f" | Transfer: {pending} tertunda" if pending else ""
+        if self._scanning:
+            transfer_text = " | Memindai folder…" + transfer_text
+        if self.journal is not None and len(self.journal):
+            transfer_text = f" | Tertunda: {len(self.journal)} keputusan" + transfer_text
+        if self.in_gallery_mode and self.gallery and self.gallery.selected:
+            transfer_text = f" | Terpilih: {len(self.gallery.selected)} (tekan 1-0 untuk batch)" + transfer_text
+
         if self.image_list and (0 <= self.current_index < len(self.image_list)):
             self.status_label.config(
-                text=f"[{mode}]  Foto {self.current_index + 1} / {len(self.image_list)}  |  Nama: {self.image_list[self.current_index]}{zoom_pct}"
+                text=f"[{mode}]  Foto {self.current_index + 1} / {len(self.image_list)}  |  Nama: {self.image_list[self.current_index]}{zoom_pct}{transfer_text}"
             )
         else:
-            self.status_label.config(text=f"[{mode}]  Tidak ada foto aktif.{zoom_pct}")
+            self.status_label.config(text=f"[{mode}]  Tidak ada foto aktif.{zoom_pct}{transfer_text}")
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()   # process pool decode di build .exe
     if CTK_AVAILABLE:
         root = ctk.CTk()
     else:
         root = tk.Tk()
     app = PhotoSorterApp(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()